@@ -4,6 +4,7 @@ import { db } from '@/lib/db'
 
 export async function getArticlesAction() {
   const articles = await db.article.findMany({
+    omit: { content: true },
     include: {
       author: true,
       category: {
@@ -1,4 +1,4 @@
-import { getArticleBySlug, getRelatedArticles, getAdjacentArticles } from "@/lib/data"
+import { getArticleBySlug, getRelatedArticles, getAdjacentArticles, getRenderArtifacts } from "@/lib/data"
 import { notFound } from "next/navigation"
 import { Metadata, PageProps } from "next"
 import { Header } from "@/components/header"
@@ -6,6 +6,7 @@ import { ReadingProgress } from "@/components/reading-progress"
 import { ArticleNavigation } from "@/components/article-navigation"
 import { ArticleHeader } from "@/components/article-header"
 import { RelatedArticles } from "@/components/related-articles"
+import { ArticleToc } from "@/components/article-toc"
 import { Badge } from "@/components/ui/badge"
 import { Separator } from "@/components/ui/separator"
 
@@ -68,6 +69,7 @@ export default async function ArticlePage({ params }: PageProps) {
     getRelatedArticles(params.slug),
     getAdjacentArticles(params.slug)
   ])
+  const artifacts = getRenderArtifacts(article)
 
   return (
     <div className="min-h-screen bg-background">
@@ -79,6 +81,8 @@ export default async function ArticlePage({ params }: PageProps) {
 
         <Separator className="mb-8" />
 
+        {artifacts && <ArticleToc entries={artifacts.toc} />}
+
         <article className="prose prose-slate dark:prose-invert max-w-none mb-12">
           <div dangerouslySetInnerHTML={{ __html: article.content }} />
         </article>
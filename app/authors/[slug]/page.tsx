@@ -94,7 +94,7 @@ export default async function AuthorPage({ params }: Props) {
             <div className="flex flex-col sm:flex-row gap-6 items-start">
               <Avatar className="h-32 w-32">
                 <AvatarImage
-                  src={`/avatars/${author.slug}.svg`}
+                  src={author.avatar}
                   alt={author.name}
                 />
                 <AvatarFallback className="text-2xl">{getInitials(author.name)}</AvatarFallback>
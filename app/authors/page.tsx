@@ -30,7 +30,7 @@ export default async function AuthorsPage() {
             >
               <div className="flex items-center mb-4">
                 <Avatar className="h-16 w-16">
-                  <AvatarImage src={`/avatars/${author.slug}.svg`} alt={author.name} />
+                  <AvatarImage src={author.avatar} alt={author.name} />
                   <AvatarFallback>{getInitials(author.name)}</AvatarFallback>
                 </Avatar>
                 <div className="ml-4">
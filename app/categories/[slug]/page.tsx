@@ -71,7 +71,7 @@ export default async function CategoryPage({ params }: CategoryPageProps) {
                   <p className="text-gray-600 mb-4">{article.description}</p>
                   <div className="flex items-center">
                     <Avatar className="h-10 w-10">
-                      <AvatarImage src={`/avatars/${article.author.slug}.svg`} alt={article.author.name} />
+                      <AvatarImage src={article.author.avatar} alt={article.author.name} />
                       <AvatarFallback>{getInitials(article.author.name)}</AvatarFallback>
                     </Avatar>
                     <div className="ml-3">
@@ -0,0 +1,28 @@
+import { TocEntry } from "@/lib/data"
+
+interface ArticleTocProps {
+  entries: TocEntry[]
+}
+
+export function ArticleToc({ entries }: ArticleTocProps) {
+  if (entries.length === 0) return null
+
+  return (
+    <nav className="mb-8 border rounded-lg p-6">
+      <h2 className="text-lg font-semibold mb-4">Sommaire</h2>
+      <ul className="space-y-2 text-sm">
+        {entries.map((entry, index) => (
+          <li key={index} className={entry.level === 3 ? "pl-4" : undefined}>
+            {entry.anchor ? (
+              <a href={`#${entry.anchor}`} className="text-muted-foreground hover:text-primary">
+                {entry.text}
+              </a>
+            ) : (
+              <span className="text-muted-foreground">{entry.text}</span>
+            )}
+          </li>
+        ))}
+      </ul>
+    </nav>
+  )
+}
@@ -24,7 +24,7 @@ export function RelatedArticles({ articles }: RelatedArticlesProps) {
             <p className="text-gray-600 text-sm mb-4">{article.description}</p>
             <div className="flex items-center">
               <Avatar className="h-8 w-8 mr-2">
-                <AvatarImage src={`/avatars/${article.author.slug}.svg`} alt={article.author.name} />
+                <AvatarImage src={article.author.avatar} alt={article.author.name} />
                 <AvatarFallback>{getInitials(article.author.name)}</AvatarFallback>
               </Avatar>
               <div>
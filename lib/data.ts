@@ -4,6 +4,7 @@ import { fr } from 'date-fns/locale'
 
 export async function getAllArticles() {
   const articles = await db.article.findMany({
+    omit: { content: true },
     include: {
       author: true,
       category: {
@@ -41,6 +42,7 @@ export async function getArticlesByCategory(categorySlug: string) {
         slug: categorySlug,
       },
     },
+    omit: { content: true },
     include: {
       author: true,
       category: true,
@@ -55,6 +57,7 @@ export async function getFeaturedArticles() {
     where: {
       featured: true,
     },
+    omit: { content: true },
     include: {
       author: true,
       category: true,
@@ -71,11 +74,21 @@ export async function getArticleBySlug(slug: string) {
       author: true,
       category: true,
       tags: true,
+      // Artefacts précalculés par prisma/render_artifacts.py
+      components: {
+        where: { type: 'render' },
+        select: { data: true },
+      },
     },
   })
   return article
 }
 
+export function getRenderArtifacts(article: { components: { data: unknown }[] }): RenderArtifacts | null {
+  const component = article.components[0]
+  return component ? (component.data as unknown as RenderArtifacts) : null
+}
+
 export function getInitials(name: string) {
   return name
     .split(' ')
@@ -93,11 +106,13 @@ export interface Article {
   title: string
   slug: string
   description: string
-  content: string
+  // Absent des listes : seule la page de détail charge le corps
+  content?: string
   author: {
     id: string
     name: string
     slug: string
+    avatar: string
   }
   publishedAt: Date
   readTime: string
@@ -115,6 +130,20 @@ export interface Article {
   citations: number
 }
 
+export interface TocEntry {
+  level: number
+  text: string
+  anchor: string | null
+}
+
+export interface RenderArtifacts {
+  excerpt: string
+  toc: TocEntry[]
+  words: number
+  readTime: string
+  references: number
+}
+
 export interface Author {
   id: string
   name: string
@@ -147,6 +176,7 @@ export async function getArticlesByAuthor(authorSlug: string) {
         slug: authorSlug,
       },
     },
+    omit: { content: true },
     include: {
       author: true,
       category: true,
@@ -200,6 +230,7 @@ export async function getRelatedArticles(currentArticleSlug: string, limit = 2):
         },
       ],
     },
+    omit: { content: true },
     include: {
       author: true,
       category: true,
@@ -28,11 +28,12 @@ export interface Article {
   title: string
   slug: string
   description: string
-  content: string
+  content?: string
   author: {
     id: string
     name: string
     slug: string
+    avatar: string
   }
   publishedAt: Date
   readTime: string
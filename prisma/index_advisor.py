@@ -0,0 +1,308 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from seed_copy import asyncpg, connect
+
+DEFAULT_OUTPUT_DIR = os.environ.get("INDEX_ADVISOR_DIR", ".cache/index-advisor")
+
+# Au-delà, un parcours séquentiel ou un tri est signalé
+SEQ_SCAN_MIN_ROWS = 1000
+SORT_MIN_ROWS = 1000
+
+
+class QueryShape:
+    """Requête SQL équivalente à celle qu'émet le moteur Prisma pour lib/data.ts
+
+    params tire des valeurs réelles dans la base seedée ; candidates liste les
+    index (table, colonnes) susceptibles de supprimer un parcours ou un tri.
+    """
+
+    def __init__(self, name: str, sql: str, params: Callable[["Samples"], Tuple],
+                 candidates: List[Tuple[str, Tuple[str, ...]]]):
+        self.name = name
+        self.sql = sql
+        self.params = params
+        self.candidates = candidates
+
+
+class Samples:
+    """Clés représentatives : les plus chargées, pour mesurer le pire cas"""
+
+    def __init__(self, row: Dict):
+        self.category = row["category"]
+        self.author = row["author"]
+        self.author_id = row["author_id"]
+        self.article_ids = row["article_ids"] or []
+        self.tag_ids = row["tag_ids"] or []
+
+    @classmethod
+    async def load(cls, conn) -> "Samples":
+        row = await conn.fetchrow(
+            """
+            SELECT
+              (SELECT c.slug FROM "Category" c JOIN "Article" a ON a."categoryId" = c.id
+               GROUP BY c.slug ORDER BY COUNT(*) DESC LIMIT 1) AS category,
+              (SELECT au.slug FROM "Author" au JOIN "Article" a ON a."authorId" = au.id
+               GROUP BY au.slug ORDER BY COUNT(*) DESC LIMIT 1) AS author,
+              (SELECT "authorId" FROM "Education" LIMIT 1) AS author_id,
+              (SELECT array_agg(id) FROM (SELECT id FROM "Article" ORDER BY views DESC LIMIT 20) t) AS article_ids,
+              (SELECT array_agg(id) FROM (SELECT id FROM "Tag" LIMIT 3) t) AS tag_ids
+            """
+        )
+        if row["category"] is None:
+            raise RuntimeError("Base vide : lancer le seed avant l'analyse")
+        return cls(dict(row))
+
+
+QUERY_SHAPES = [
+    QueryShape(
+        "articles_by_category",
+        'SELECT a.* FROM "Article" a WHERE a."categoryId" = (SELECT id FROM "Category" WHERE slug = $1)',
+        lambda s: (s.category,),
+        [("Article", ("categoryId",))]
+    ),
+    QueryShape(
+        "articles_by_author",
+        'SELECT a.* FROM "Article" a WHERE a."authorId" = (SELECT id FROM "Author" WHERE slug = $1)',
+        lambda s: (s.author,),
+        [("Article", ("authorId",))]
+    ),
+    QueryShape(
+        "featured_articles",
+        'SELECT * FROM "Article" WHERE featured = true',
+        lambda s: (),
+        [("Article", ("featured",))]
+    ),
+    QueryShape(
+        "latest_articles",
+        'SELECT * FROM "Article" ORDER BY "publishedAt" DESC LIMIT 20',
+        lambda s: (),
+        [("Article", ("publishedAt",))]
+    ),
+    QueryShape(
+        "category_counts",
+        'SELECT "categoryId", COUNT(*) FROM "Article" GROUP BY "categoryId"',
+        lambda s: (),
+        [("Article", ("categoryId",))]
+    ),
+    QueryShape(
+        "article_tags",
+        'SELECT t.* FROM "_ArticleToTag" at JOIN "Tag" t ON t.id = at."B" WHERE at."A" = ANY($1::text[])',
+        lambda s: (s.article_ids,),
+        [("_ArticleToTag", ("A",))]
+    ),
+    QueryShape(
+        "articles_by_tags",
+        'SELECT DISTINCT "A" FROM "_ArticleToTag" WHERE "B" = ANY($1::text[])',
+        lambda s: (s.tag_ids,),
+        [("_ArticleToTag", ("B",))]
+    ),
+    QueryShape(
+        "author_education",
+        'SELECT * FROM "Education" WHERE "authorId" = $1',
+        lambda s: (s.author_id,),
+        [("Education", ("authorId",))]
+    ),
+    QueryShape(
+        "article_components",
+        'SELECT * FROM "Component" WHERE "articleId" = ANY($1::text[])',
+        lambda s: (s.article_ids,),
+        [("Component", ("articleId",))]
+    ),
+]
+
+
+def index_name(table: str, columns: Tuple[str, ...]) -> str:
+    """Nom d'index au format des migrations Prisma (Article_authorId_idx)"""
+    return f"{table}_{'_'.join(columns)}_idx"
+
+
+def index_sql(table: str, columns: Tuple[str, ...]) -> str:
+    cols = ", ".join(f'"{column}"' for column in columns)
+    return f'CREATE INDEX "{index_name(table, columns)}" ON "{table}"({cols});'
+
+
+def walk(plan: Dict) -> Iterator[Dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+def findings(plan: Dict) -> List[str]:
+    """Parcours séquentiels et tris coûteux d'un plan EXPLAIN (FORMAT JSON)"""
+    found = []
+    for node in walk(plan):
+        # Les compteurs d'EXPLAIN ANALYZE sont des moyennes par boucle
+        loops = node.get("Actual Loops", 1)
+        rows = node.get("Actual Rows", 0) * loops
+        if node["Node Type"] == "Seq Scan":
+            scanned = rows + node.get("Rows Removed by Filter", 0) * loops
+            if scanned >= SEQ_SCAN_MIN_ROWS:
+                found.append(f'Seq Scan sur {node["Relation Name"]} ({scanned} lignes lues, {rows} gardées)')
+        elif node["Node Type"] in ("Sort", "Incremental Sort"):
+            if rows >= SORT_MIN_ROWS or node.get("Sort Space Type") == "Disk":
+                found.append(f'Sort {node.get("Sort Method", "")} sur {rows} lignes ({node.get("Sort Space Type", "?")})')
+    return found
+
+
+async def explain(conn, shape: QueryShape, params: Tuple, repeat: int) -> Tuple[float, List[str], Dict]:
+    """Temps d'exécution médian (ms), problèmes relevés et plan du dernier passage"""
+    times = []
+    plan: Dict = {}
+    for _ in range(repeat):
+        result = await conn.fetchval(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {shape.sql}", *params)
+        data = json.loads(result) if isinstance(result, str) else result
+        plan = data[0]
+        times.append(plan["Execution Time"])
+    return statistics.median(times), findings(plan["Plan"]), plan
+
+
+async def existing_indexes(conn) -> Dict[str, List[Tuple[str, ...]]]:
+    """Colonnes de tête de chaque index existant, par table"""
+    rows = await conn.fetch(
+        """
+        SELECT ct.relname AS table, array_agg(a.attname ORDER BY k.ord) AS columns
+        FROM pg_index i
+        JOIN pg_class ct ON ct.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = ct.relnamespace
+        CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = ct.oid AND a.attnum = k.attnum
+        WHERE n.nspname = current_schema()
+        GROUP BY ct.relname, i.indexrelid
+        """
+    )
+    indexes: Dict[str, List[Tuple[str, ...]]] = {}
+    for row in rows:
+        indexes.setdefault(row["table"], []).append(tuple(row["columns"]))
+    return indexes
+
+
+def covered(indexes: Dict[str, List[Tuple[str, ...]]], table: str, columns: Tuple[str, ...]) -> bool:
+    return any(index[:len(columns)] == columns for index in indexes.get(table, []))
+
+
+async def try_index(conn, shape: QueryShape, params: Tuple, table: str, columns: Tuple[str, ...],
+                    repeat: int) -> Tuple[float, List[str]]:
+    """Mesure la requête avec l'index candidat, dans une transaction annulée ensuite"""
+    transaction = conn.transaction()
+    await transaction.start()
+    try:
+        await conn.execute(index_sql(table, columns))
+        await conn.execute(f'ANALYZE "{table}"')
+        after, problems, _ = await explain(conn, shape, params, repeat)
+    finally:
+        await transaction.rollback()
+    return after, problems
+
+
+async def analyze(url: str, repeat: int) -> Dict:
+    conn = await connect(url)
+    try:
+        await conn.execute("ANALYZE")
+        samples = await Samples.load(conn)
+        indexes = await existing_indexes(conn)
+        results = []
+        proposed: Dict[Tuple[str, Tuple[str, ...]], Dict] = {}
+        for shape in QUERY_SHAPES:
+            params = shape.params(samples)
+            before, problems, _ = await explain(conn, shape, params, repeat)
+            entry = {"query": shape.name, "before_ms": round(before, 3), "problems": problems, "candidates": []}
+            if problems:
+                for table, columns in shape.candidates:
+                    if covered(indexes, table, columns):
+                        continue
+                    after, remaining = await try_index(conn, shape, params, table, columns, repeat)
+                    # Retenu seulement si un problème disparaît et que la requête accélère
+                    useful = len(remaining) < len(problems) and after < before
+                    entry["candidates"].append({
+                        "index": index_name(table, columns),
+                        "after_ms": round(after, 3),
+                        "speedup": round(before / after, 1) if after > 0 else None,
+                        "remaining": remaining,
+                        "useful": useful
+                    })
+                    if useful:
+                        proposed.setdefault((table, columns), {"queries": []})["queries"].append(shape.name)
+            results.append(entry)
+        return {
+            "queries": results,
+            "indexes": [
+                {"table": table, "columns": list(columns), "name": index_name(table, columns),
+                 "sql": index_sql(table, columns), "queries": info["queries"]}
+                for (table, columns), info in proposed.items()
+            ]
+        }
+    finally:
+        await conn.close()
+
+
+def migration(report: Dict) -> str:
+    """Migration candidate au format de prisma/migrations, avec les @@index correspondants"""
+    lines = ["-- Index proposés par prisma/index_advisor.py après un seed", ""]
+    for index in report["indexes"]:
+        model = index["table"]
+        if not model.startswith("_"):
+            lines.append(f"-- schema.prisma, model {model} : @@index([{', '.join(index['columns'])}])")
+        lines.append(f"-- Requêtes : {', '.join(index['queries'])}")
+        lines.append("-- CreateIndex")
+        lines.append(index["sql"])
+        lines.append("")
+    return "\n".join(lines)
+
+
+def print_report(report: Dict):
+    for entry in report["queries"]:
+        status = "OK" if not entry["problems"] else "; ".join(entry["problems"])
+        print(f"{entry['query']:<22} {entry['before_ms']:>10.2f}ms  {status}")
+        for candidate in entry["candidates"]:
+            verdict = "retenu" if candidate["useful"] else "sans effet"
+            print(f"    + {candidate['index']:<32} {candidate['after_ms']:>10.2f}ms  x{candidate['speedup']}  {verdict}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Analyse les plans des requêtes du site et propose des index")
+    parser.add_argument("--repeat", type=int, default=3, help="exécutions par mesure (médiane)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="dossier du rapport et de la migration candidate")
+    parser.add_argument("--migration-name", help="écrit aussi la migration dans prisma/migrations/<horodatage>_<nom>")
+    return parser.parse_args()
+
+
+async def advise(output: str = DEFAULT_OUTPUT_DIR, repeat: int = 3, migration_name: Optional[str] = None) -> Dict:
+    """Analyse la base de DATABASE_URL, affiche le résultat et écrit rapport et migration"""
+    if asyncpg is None:
+        raise RuntimeError("L'analyse nécessite asyncpg (pip install asyncpg)")
+    report = await analyze(os.environ["DATABASE_URL"], repeat)
+    print_report(report)
+
+    os.makedirs(output, exist_ok=True)
+    with open(os.path.join(output, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    if not report["indexes"]:
+        print("Aucun index à proposer.")
+        return report
+    sql = migration(report)
+    paths = [os.path.join(output, "migration.sql")]
+    if migration_name:
+        folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations",
+                              f"{datetime.now():%Y%m%d%H%M%S}_{migration_name}")
+        os.makedirs(folder, exist_ok=True)
+        paths.append(os.path.join(folder, "migration.sql"))
+    for path in paths:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(sql)
+        print(f"Migration candidate : {path}")
+    return report
+
+
+async def main():
+    args = parse_args()
+    await advise(args.output, args.repeat, args.migration_name)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from prisma import Prisma
+
+from seed_distributions import AliasTable
+
+DEFAULT_REPORT_PATH = os.environ.get("LOADGEN_REPORT", ".cache/loadgen-report.json")
+
+# Mélange par défaut : surtout des pages article, quelques listes
+DEFAULT_MIX = "article_by_slug=70,articles_by_category=15,featured_articles=10,all_articles=5"
+
+# Même include que les fonctions de lib/data.ts
+ARTICLE_INCLUDE = {"author": True, "category": True, "tags": True}
+
+
+class Keys:
+    """Slugs tirés de la base seedée, pondérés comme le trafic réel
+
+    Les articles sont tirés proportionnellement à leurs vues et les
+    catégories à leur nombre d'articles, sauf avec uniform.
+    """
+
+    def __init__(self, articles: List[Tuple[str, int]], categories: List[Tuple[str, int]], uniform: bool = False):
+        self.articles = [slug for slug, _ in articles]
+        self.categories = [slug for slug, _ in categories]
+        self._articles = AliasTable([1 if uniform else max(1, views) for _, views in articles])
+        self._categories = AliasTable([1 if uniform else max(1, count) for _, count in categories])
+
+    @classmethod
+    async def load(cls, db: Prisma, limit: int, uniform: bool = False) -> "Keys":
+        articles = await db.query_raw(
+            'SELECT slug, views FROM "Article" ORDER BY random() LIMIT $1', limit
+        )
+        categories = await db.query_raw(
+            'SELECT c.slug, COUNT(a.id)::int AS articles FROM "Category" c '
+            'LEFT JOIN "Article" a ON a."categoryId" = c.id GROUP BY c.slug'
+        )
+        if not articles or not categories:
+            raise RuntimeError("Base vide : lancer seed2.py avant le générateur de charge")
+        return cls(
+            [(row["slug"], row["views"]) for row in articles],
+            [(row["slug"], row["articles"]) for row in categories],
+            uniform
+        )
+
+    def article(self, rng: random.Random) -> str:
+        return self.articles[self._articles.sample(rng)]
+
+    def category(self, rng: random.Random) -> str:
+        return self.categories[self._categories.sample(rng)]
+
+
+# Formes de requêtes de lib/data.ts
+async def all_articles(db: Prisma, keys: Keys, rng: random.Random):
+    """getAllArticles ; le _count des catégories devient un group_by"""
+    await db.article.find_many(include=ARTICLE_INCLUDE)
+    await db.article.group_by(["categoryId"], count=True)
+
+
+async def articles_by_category(db: Prisma, keys: Keys, rng: random.Random):
+    """getArticlesByCategory"""
+    await db.article.find_many(
+        where={"category": {"is": {"slug": keys.category(rng)}}},
+        include=ARTICLE_INCLUDE
+    )
+
+
+async def featured_articles(db: Prisma, keys: Keys, rng: random.Random):
+    """getFeaturedArticles"""
+    await db.article.find_many(where={"featured": True}, include=ARTICLE_INCLUDE)
+
+
+async def article_by_slug(db: Prisma, keys: Keys, rng: random.Random):
+    """getArticleBySlug"""
+    await db.article.find_unique(where={"slug": keys.article(rng)}, include=ARTICLE_INCLUDE)
+
+
+QUERY_SHAPES: Dict[str, Callable[[Prisma, Keys, random.Random], Awaitable]] = {
+    "all_articles": all_articles,
+    "articles_by_category": articles_by_category,
+    "featured_articles": featured_articles,
+    "article_by_slug": article_by_slug,
+}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """'article_by_slug=70,all_articles=5' -> poids par forme de requête"""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in QUERY_SHAPES:
+            raise ValueError(f"Requête inconnue : {name} (disponibles : {', '.join(QUERY_SHAPES)})")
+        mix[name] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def with_pool_size(url: str, size: int) -> str:
+    """Fixe connection_limit, la taille du pool du moteur Prisma, dans DATABASE_URL"""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != "connection_limit"]
+    query.append(("connection_limit", str(size)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Percentile au rang le plus proche sur des valeurs triées"""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed > 0 else 0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+    }
+
+
+async def run_load(db: Prisma, keys: Keys, mix: Dict[str, float], concurrency: int,
+                   duration: float, max_requests: int, seed: int) -> Dict:
+    """Lance concurrency clients qui enchaînent les requêtes jusqu'à la durée ou au quota"""
+    names = list(mix)
+    table = AliasTable([mix[name] for name in names])
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    issued = 0
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def client(index: int):
+        nonlocal issued
+        rng = random.Random(seed + index)
+        while time.perf_counter() < deadline and (not max_requests or issued < max_requests):
+            issued += 1
+            name = names[table.sample(rng)]
+            began = time.perf_counter()
+            try:
+                await QUERY_SHAPES[name](db, keys, rng)
+            except Exception as e:
+                errors[name] += 1
+                if errors[name] == 1:
+                    print(f"Erreur {name}: {e}")
+                continue
+            latencies[name].append(time.perf_counter() - began)
+
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    every = [value for values in latencies.values() for value in values]
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "concurrency": concurrency,
+        "mix": mix,
+        "total": summarize(every, sum(errors.values()), elapsed),
+        "queries": {name: summarize(latencies[name], errors[name], elapsed) for name in names},
+    }
+
+
+def print_report(report: Dict):
+    print(f"{report['elapsed_s']:.1f}s, {report['concurrency']} clients")
+    print(f"  {'requête':<22} {'n':>7} {'err':>5} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    rows = list(report["queries"].items()) + [("total", report["total"])]
+    for name, q in rows:
+        print(f"  {name:<22} {q['requests']:>7} {q['errors']:>5} {q['throughput_rps']:>8.1f} "
+              f"{q['p50_ms']:>7.1f}ms {q['p95_ms']:>7.1f}ms {q['p99_ms']:>7.1f}ms {q['max_ms']:>7.1f}ms")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rejoue les requêtes de lib/data.ts sur la base seedée")
+    parser.add_argument("--concurrency", type=int, default=16, help="clients simultanés")
+    parser.add_argument("--duration", type=float, default=30.0, help="durée du test en secondes")
+    parser.add_argument("--requests", type=int, default=0, help="arrêt après ce nombre de requêtes (0 : durée seule)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"poids des requêtes (défaut : {DEFAULT_MIX})")
+    parser.add_argument("--pool-size", type=int, help="connection_limit du moteur Prisma")
+    parser.add_argument("--keys", type=int, default=10000, help="nombre de slugs d'articles échantillonnés")
+    parser.add_argument("--uniform", action="store_true", help="tire les slugs uniformément au lieu de suivre les vues")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", default=DEFAULT_REPORT_PATH, help="fichier JSON du rapport")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    mix = parse_mix(args.mix)
+
+    if args.pool_size:
+        db = Prisma(datasource={"url": with_pool_size(os.environ["DATABASE_URL"], args.pool_size)})
+    else:
+        db = Prisma()
+    await db.connect()
+    try:
+        keys = await Keys.load(db, args.keys, args.uniform)
+        print(f"{len(keys.articles)} articles et {len(keys.categories)} catégories échantillonnés")
+        report = await run_load(db, keys, mix, args.concurrency, args.duration, args.requests, args.seed)
+    finally:
+        await db.disconnect()
+
+    report["pool_size"] = args.pool_size
+    print_report(report)
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Rapport JSON : {args.report}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
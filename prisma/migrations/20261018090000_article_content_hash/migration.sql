@@ -0,0 +1,2 @@
+-- AlterTable
+ALTER TABLE "Article" ADD COLUMN     "contentHash" TEXT;
@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+import hashlib
+import time
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+from prisma import Json, Prisma
+
+from seed_content import read_time
+from seed_slugs import clean_string
+
+# Type des lignes Component qui portent les artefacts d'un article
+COMPONENT_TYPE = "render"
+# À incrémenter quand l'extraction change : tous les articles sont alors retraités
+VERSION = 1
+
+EXCERPT_CHARS = 280
+TOC_LEVELS = {"h2": 2, "h3": 3}
+HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+SKIPPED = {"script", "style"}
+# Titres de section de la bibliographie, sans accents et en minuscules
+REFERENCE_TITLES = {"references", "bibliographie", "sources"}
+
+
+class ArtifactParser(HTMLParser):
+    """Extrait en une passe le texte, les titres et les références d'un contenu HTML
+
+    Le contenu est lu par fragments via feed() ; seuls l'extrait et la table
+    des matières sont conservés, pas le texte complet. L'ancre d'une entrée
+    est l'id du titre dans le HTML, None s'il n'en a pas.
+    """
+
+    def __init__(self, excerpt_chars: int = EXCERPT_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.excerpt_chars = excerpt_chars
+        self.words = 0
+        self.references = 0
+        self.toc: List[Dict] = []
+        self.excerpt = ""
+        self._excerpt_full = False
+        self._skip = 0
+        self._heading: Optional[str] = None
+        self._heading_id: Optional[str] = None
+        self._heading_text: List[str] = []
+        self._paragraph: Optional[List[str]] = None
+        self._in_references = False
+        # Morceaux du nœud texte courant, que feed() peut couper en plusieurs appels
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs):
+        self._flush_text()
+        if tag in SKIPPED:
+            self._skip += 1
+        elif tag in HEADINGS:
+            self._heading = tag
+            self._heading_id = dict(attrs).get("id")
+            self._heading_text = []
+        elif tag == "p" and not self._excerpt_full:
+            self._paragraph = []
+        elif tag == "li" and self._in_references:
+            self.references += 1
+
+    def handle_endtag(self, tag: str):
+        self._flush_text()
+        if tag in SKIPPED:
+            self._skip = max(0, self._skip - 1)
+        elif tag == self._heading:
+            self._end_heading("".join(self._heading_text).split())
+        elif tag == "p" and self._paragraph is not None:
+            self._add_excerpt(" ".join("".join(self._paragraph).split()))
+            self._paragraph = None
+
+    def handle_data(self, data: str):
+        if not self._skip:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+
+    def _flush_text(self):
+        if not self._text:
+            return
+        data = "".join(self._text)
+        self._text = []
+        self.words += len(data.split())
+        if self._heading is not None:
+            self._heading_text.append(data)
+        elif self._paragraph is not None:
+            self._paragraph.append(data)
+
+    def _end_heading(self, words: List[str]):
+        title = " ".join(words)
+        self._in_references = clean_string(title).lower() in REFERENCE_TITLES
+        if self._heading in TOC_LEVELS and title:
+            self.toc.append({"level": TOC_LEVELS[self._heading], "text": title, "anchor": self._heading_id})
+        self._heading = None
+
+    def _add_excerpt(self, paragraph: str):
+        if not paragraph:
+            return
+        excerpt = f"{self.excerpt} {paragraph}".strip()
+        if len(excerpt) > self.excerpt_chars:
+            # Coupe au dernier mot complet
+            excerpt = excerpt[:self.excerpt_chars].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+            self._excerpt_full = True
+        self.excerpt = excerpt
+
+    def artifacts(self) -> Dict:
+        return {
+            "excerpt": self.excerpt,
+            "toc": self.toc,
+            "words": self.words,
+            "readTime": read_time(self.words),
+            "references": self.references,
+        }
+
+
+def extract_artifacts(content: str, chunk_size: int = 64 * 1024) -> Dict:
+    """Artefacts de rendu d'un contenu HTML, analysé par fragments de chunk_size"""
+    parser = ArtifactParser()
+    for start in range(0, len(content), chunk_size):
+        parser.feed(content[start:start + chunk_size])
+    parser.close()
+    return parser.artifacts()
+
+
+async def _stale(db: Prisma, last_id: str, batch_size: int, force: bool) -> List[Dict]:
+    """La page suivante (pagination par id) des articles dont les artefacts sont à refaire
+
+    Seules les empreintes sont comparées : le contenu n'est lu que pour les
+    articles sans contentHash, écrits hors du seed.
+    """
+    return await db.query_raw(
+        'SELECT a.id, c.id AS "componentId" '
+        'FROM "Article" a LEFT JOIN "Component" c ON c."articleId" = a.id AND c.type = $1 '
+        'WHERE a.id > $2 AND ($4::boolean OR c.id IS NULL '
+        "OR c.data->>'hash' IS DISTINCT FROM COALESCE(a.\"contentHash\", md5(a.content)) "
+        "OR (c.data->>'version')::int IS DISTINCT FROM $5::int) "
+        'ORDER BY a.id LIMIT $3',
+        COMPONENT_TYPE, last_id, batch_size, force, VERSION
+    )
+
+
+async def _write(db: Prisma, rows: List[Dict]):
+    """Artefacts, readTime et contentHash d'un lot d'articles, dans une seule transaction"""
+    contents = await db.query_raw(
+        'SELECT id, content FROM "Article" WHERE id = ANY($1::text[])',
+        [row["id"] for row in rows]
+    )
+    content_by_id = {row["id"]: row["content"] for row in contents}
+    async with db.batch_() as batcher:
+        for row in rows:
+            content = content_by_id.get(row["id"])
+            if content is None:
+                continue
+            # Empreinte du contenu effectivement analysé, identique à md5(content) en base
+            content_hash = hashlib.md5(content.encode("utf-8")).hexdigest()
+            artifacts = extract_artifacts(content)
+            data = Json({"hash": content_hash, "version": VERSION, **artifacts})
+            if row["componentId"]:
+                batcher.component.update(where={"id": row["componentId"]}, data={"data": data})
+            else:
+                batcher.component.create(data={"type": COMPONENT_TYPE, "data": data, "articleId": row["id"]})
+            batcher.article.update(
+                where={"id": row["id"]},
+                data={"readTime": artifacts["readTime"], "contentHash": content_hash}
+            )
+
+
+async def precompute(db: Prisma, batch_size: int = 200, force: bool = False) -> Dict[str, int]:
+    """Recalcule les artefacts des articles dont le contenu a changé depuis le dernier passage
+
+    Le changement est détecté par Article.contentHash, posé à l'écriture par
+    le seed et ici même : qui modifie content doit le mettre à jour ou le
+    remettre à NULL. Un passage sans changement ne lit aucun contenu.
+    """
+    counts = {"articles": await db.article.count(), "updated": 0}
+    last_id = ""
+    while True:
+        rows = await _stale(db, last_id, batch_size, force)
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+        await _write(db, rows)
+        counts["updated"] += len(rows)
+    return counts
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Précalcule extrait, table des matières et temps de lecture des articles")
+    parser.add_argument("--batch-size", type=int, default=200, help="articles par page et par transaction")
+    parser.add_argument("--force", action="store_true", help="retraite tous les articles, même inchangés")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    db = Prisma()
+    await db.connect()
+    start = time.perf_counter()
+    try:
+        counts = await precompute(db, args.batch_size, args.force)
+    finally:
+        await db.disconnect()
+    print(f"Artefacts : {counts['updated']} articles retraités sur {counts['articles']} "
+          f"en {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
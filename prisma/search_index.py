@@ -0,0 +1,431 @@
+import argparse
+import asyncio
+import heapq
+import math
+import mmap
+import os
+import re
+import shutil
+import struct
+import tempfile
+from array import array
+from collections import defaultdict
+from html import unescape
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from seed_slugs import clean_string
+
+try:
+    import numpy as np
+except ImportError:  # numpy est optionnel, le classement reste possible en Python pur
+    np = None
+
+DEFAULT_INDEX_PATH = os.environ.get("SEARCH_INDEX", ".cache/search-index.bin")
+
+MAGIC = b"BSIX"
+VERSION = 1
+# magic, version, documents, termes, longueur moyenne, puis offsets des sections
+HEADER = struct.Struct("<4sIIIdQQQQQ")
+DOC_ENTRY = struct.Struct("<QI")
+# offset et longueur du terme, df, offset des postings, offset et taille des positions
+TERM_ENTRY = struct.Struct("<QIIQQI")
+
+TAG_RE = re.compile(r"<(script|style)\b.*?</\1>|<[^>]+>", re.S | re.I)
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Mots vides français après repli des accents ; ils comptent dans les positions
+STOPWORDS = frozenset("""
+a au aux avec ce ces d dans de des du elle en est et eu il ils je l la le les leur lui ma mais me
+meme mes moi mon n ne nos notre nous on ou par pas pour qu que qui s sa se ses son sur t ta te tes
+toi ton tu un une vos votre vous y c j m etait ete sont cette cet
+""".split())
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def strip_html(html: str) -> str:
+    """Texte brut d'un contenu HTML (balises, scripts et entités retirés)"""
+    return unescape(TAG_RE.sub(" ", html))
+
+
+def tokenize(text: str) -> List[Tuple[int, str]]:
+    """(position, terme) en minuscules sans accents, mots vides exclus mais comptés"""
+    tokens = TOKEN_RE.findall(clean_string(text).lower())
+    return [(position, token) for position, token in enumerate(tokens) if token not in STOPWORDS]
+
+
+def _varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varints(buffer, offset: int, count: int) -> Tuple[List[int], int]:
+    values = []
+    for _ in range(count):
+        value = shift = 0
+        while True:
+            byte = buffer[offset]
+            offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        values.append(value)
+    return values, offset
+
+
+class _Postings:
+    """Postings d'un terme pendant la construction : documents, fréquences, positions"""
+
+    __slots__ = ("docs", "tfs", "positions")
+
+    def __init__(self):
+        self.docs = array("I")
+        self.tfs = array("H")
+        self.positions = bytearray()
+
+    def size(self) -> int:
+        return len(self.docs) * 6 + len(self.positions)
+
+
+class IndexBuilder:
+    """Construit l'index inversé par segments bornés en mémoire, fusionnés à la fin
+
+    Les documents sont numérotés dans l'ordre d'arrivée : un segment couvre
+    une plage de numéros, la fusion se résume donc à concaténer les postings
+    de chaque terme segment après segment.
+    """
+
+    def __init__(self, path: str, memory_mb: int = 256):
+        self.path = path
+        self.budget = memory_mb * 1024 * 1024
+        self.tmp_dir = tempfile.mkdtemp(prefix="search-index-")
+        self.terms: Dict[str, _Postings] = defaultdict(_Postings)
+        self.used = 0
+        self.segments: List[str] = []
+        self.lengths = array("I")
+        self.doc_offsets = array("Q")
+        self.doc_strings = open(os.path.join(self.tmp_dir, "docs"), "w+b")
+        self.total_length = 0
+
+    def add(self, slug: str, title: str, text: str):
+        """Indexe un document ; slug et titre sont restitués dans les résultats"""
+        doc = len(self.lengths)
+        tokens = tokenize(text)
+        self.lengths.append(len(tokens))
+        self.total_length += len(tokens)
+        self.doc_offsets.append(self.doc_strings.tell())
+        self.doc_strings.write(f"{slug}\0{title}".encode("utf-8"))
+
+        grouped: Dict[str, List[int]] = defaultdict(list)
+        for position, token in tokens:
+            grouped[token].append(position)
+        for token, positions in grouped.items():
+            # tf est stocké sur 16 bits : les positions au-delà sont ignorées
+            positions = positions[:0xFFFF]
+            postings = self.terms[token]
+            before = postings.size()
+            postings.docs.append(doc)
+            postings.tfs.append(min(len(positions), 0xFFFF))
+            previous = 0
+            for position in positions:
+                _varint(position - previous, postings.positions)
+                previous = position
+            self.used += postings.size() - before
+        if self.used >= self.budget:
+            self._flush_segment()
+
+    def _flush_segment(self):
+        if not self.terms:
+            return
+        path = os.path.join(self.tmp_dir, f"segment-{len(self.segments)}")
+        with open(path, "wb") as f:
+            for term in sorted(self.terms):
+                postings = self.terms[term]
+                encoded = term.encode("utf-8")
+                f.write(struct.pack("<HII", len(encoded), len(postings.docs), len(postings.positions)))
+                f.write(encoded)
+                f.write(postings.docs.tobytes())
+                f.write(postings.tfs.tobytes())
+                f.write(postings.positions)
+        self.segments.append(path)
+        self.terms = defaultdict(_Postings)
+        self.used = 0
+
+    @staticmethod
+    def _read_segment(path: str) -> Iterator[Tuple[str, bytes, bytes, bytes]]:
+        with open(path, "rb") as f:
+            while header := f.read(10):
+                term_len, df, pos_len = struct.unpack("<HII", header)
+                term = f.read(term_len).decode("utf-8")
+                yield term, f.read(df * 4), f.read(df * 2), f.read(pos_len)
+
+    def finish(self) -> Dict:
+        """Fusionne les segments et écrit le fichier d'index final"""
+        self._flush_segment()
+        n_docs = len(self.lengths)
+        merged = heapq.merge(*(self._read_segment(path) for path in self.segments), key=lambda entry: entry[0])
+
+        entries: List[Tuple[str, int, int, int, int]] = []
+        with open(os.path.join(self.tmp_dir, "postings"), "w+b") as postings:
+            current: Optional[str] = None
+            parts: List[Tuple[bytes, bytes, bytes]] = []
+
+            def write_term():
+                docs = b"".join(p[0] for p in parts)
+                tfs = b"".join(p[1] for p in parts)
+                positions = b"".join(p[2] for p in parts)
+                offset = postings.tell()
+                postings.write(docs)
+                postings.write(tfs)
+                entries.append((current, len(docs) // 4, offset, offset + len(docs) + len(tfs), len(positions)))
+                postings.write(positions)
+
+            for term, docs, tfs, positions in merged:
+                if term != current and parts:
+                    write_term()
+                    parts = []
+                current = term
+                parts.append((docs, tfs, positions))
+            if parts:
+                write_term()
+
+            self._write(n_docs, entries, postings)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        return {"documents": n_docs, "terms": len(entries), "bytes": os.path.getsize(self.path)}
+
+    def _write(self, n_docs: int, entries: List[Tuple[str, int, int, int, int]], postings: BinaryIO):
+        lengths_off = HEADER.size
+        docs_off = lengths_off + n_docs * 4
+        terms_off = docs_off + n_docs * DOC_ENTRY.size
+        postings_off = terms_off + len(entries) * TERM_ENTRY.size
+        strings_off = postings_off + postings.tell()
+        doc_strings_size = self.doc_strings.tell()
+        avgdl = self.total_length / n_docs if n_docs else 0.0
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, n_docs, len(entries), avgdl,
+                                lengths_off, docs_off, terms_off, postings_off, strings_off))
+            f.write(self.lengths.tobytes())
+            ends = list(self.doc_offsets[1:]) + [doc_strings_size]
+            for start, end in zip(self.doc_offsets, ends):
+                f.write(DOC_ENTRY.pack(start, end - start))
+
+            # Le lexique suit les chaînes des documents dans la section des chaînes
+            lexicon_off = doc_strings_size
+            lexicon = bytearray()
+            for term, df, doc_offset, pos_offset, pos_len in entries:
+                encoded = term.encode("utf-8")
+                f.write(TERM_ENTRY.pack(lexicon_off + len(lexicon), len(encoded), df,
+                                        postings_off + doc_offset, postings_off + pos_offset, pos_len))
+                lexicon += encoded
+
+            postings.seek(0)
+            shutil.copyfileobj(postings, f)
+            self.doc_strings.seek(0)
+            shutil.copyfileobj(self.doc_strings, f)
+            f.write(lexicon)
+        self.doc_strings.close()
+        os.replace(tmp_path, self.path)
+
+
+class SearchIndex:
+    """Lecture de l'index par mmap : recherche dichotomique des termes, classement BM25
+
+    Une requête entre guillemets ("changement climatique") est cherchée comme
+    une phrase, à l'aide des positions.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.n_docs, self.n_terms, self.avgdl, lengths_off,
+         self.docs_off, self.terms_off, self.postings_off, self.strings_off) = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} n'est pas un index de recherche v{VERSION}")
+        self.lengths = memoryview(self.map)[lengths_off:lengths_off + self.n_docs * 4].cast("I")
+
+    def close(self):
+        self.lengths.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self) -> "SearchIndex":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _term(self, index: int) -> Tuple[bytes, int, int, int, int]:
+        lex_off, lex_len, df, docs_off, pos_off, pos_len = TERM_ENTRY.unpack_from(
+            self.map, self.terms_off + index * TERM_ENTRY.size
+        )
+        start = self.strings_off + lex_off
+        return self.map[start:start + lex_len], df, docs_off, pos_off, pos_len
+
+    def lookup(self, term: str) -> Optional[Tuple[int, int, int, int]]:
+        """(df, offset des postings, offset et taille des positions) ou None"""
+        target = term.encode("utf-8")
+        low, high = 0, self.n_terms
+        while low < high:
+            middle = (low + high) // 2
+            found = self._term(middle)
+            if found[0] < target:
+                low = middle + 1
+            elif found[0] > target:
+                high = middle
+            else:
+                return found[1:]
+        return None
+
+    def postings(self, term: str) -> Tuple[memoryview, memoryview]:
+        """Numéros de documents et fréquences d'un terme, sans copie"""
+        found = self.lookup(term)
+        if found is None:
+            return memoryview(b"").cast("I"), memoryview(b"").cast("H")
+        df, offset, _, _ = found
+        view = memoryview(self.map)
+        return view[offset:offset + df * 4].cast("I"), view[offset + df * 4:offset + df * 6].cast("H")
+
+    def positions(self, term: str) -> Dict[int, List[int]]:
+        """Positions du terme dans chaque document"""
+        found = self.lookup(term)
+        if found is None:
+            return {}
+        df, offset, pos_off, _ = found
+        docs, tfs = self.postings(term)
+        result: Dict[int, List[int]] = {}
+        cursor = pos_off
+        for doc, tf in zip(docs, tfs):
+            deltas, cursor = _read_varints(self.map, cursor, tf)
+            absolute, current = [], 0
+            for delta in deltas:
+                current += delta
+                absolute.append(current)
+            result[doc] = absolute
+        return result
+
+    def document(self, doc: int) -> Tuple[str, str]:
+        """(slug, titre) d'un document"""
+        offset, length = DOC_ENTRY.unpack_from(self.map, self.docs_off + doc * DOC_ENTRY.size)
+        start = self.strings_off + offset
+        slug, _, title = self.map[start:start + length].decode("utf-8").partition("\0")
+        return slug, title
+
+    def _phrase_docs(self, phrase: List[Tuple[int, str]]) -> Optional[set]:
+        """Documents contenant les termes de phrase aux écarts de la requête"""
+        base = phrase[0][0]
+        positions = [(pos - base, self.positions(term)) for pos, term in phrase]
+        candidates = set(positions[0][1])
+        for _, by_doc in positions[1:]:
+            candidates &= set(by_doc)
+        matches = set()
+        for doc in candidates:
+            starts = set(positions[0][1][doc])
+            for gap, by_doc in positions[1:]:
+                starts &= {p - gap for p in by_doc[doc]}
+                if not starts:
+                    break
+            if starts:
+                matches.add(doc)
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[float, str, str]]:
+        """Meilleurs documents pour query : [(score BM25, slug, titre)]"""
+        phrases = [tokenize(phrase) for phrase in re.findall(r'"([^"]+)"', query)]
+        terms = [term for _, term in tokenize(query.replace('"', " "))]
+        if not terms or not self.n_docs:
+            return []
+        allowed: Optional[set] = None
+        for phrase in phrases:
+            if len(phrase) > 1:
+                docs = self._phrase_docs(phrase)
+                allowed = docs if allowed is None else allowed & docs
+
+        scores = self._score(terms)
+        if allowed is not None:
+            scores = {doc: score for doc, score in scores.items() if doc in allowed}
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(round(score, 4), *self.document(doc)) for doc, score in best]
+
+    def _score(self, terms: Iterable[str]) -> Dict[int, float]:
+        avgdl = self.avgdl or 1.0
+        scores: Dict[int, float] = defaultdict(float)
+        if np is not None:
+            lengths = np.frombuffer(self.lengths, dtype=np.uint32)
+        for term in set(terms):
+            docs, tfs = self.postings(term)
+            if not len(docs):
+                continue
+            idf = math.log(1 + (self.n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            if np is not None:
+                doc_ids = np.frombuffer(docs, dtype=np.uint32)
+                tf = np.frombuffer(tfs, dtype=np.uint16).astype(np.float64)
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_ids] / avgdl)
+                for doc, value in zip(doc_ids.tolist(), (idf * tf * (BM25_K1 + 1) / (tf + norm)).tolist()):
+                    scores[doc] += value
+                continue
+            lengths_view = self.lengths
+            for doc, tf in zip(docs, tfs):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths_view[doc] / avgdl)
+                scores[doc] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+
+async def build_from_db(db, path: str = DEFAULT_INDEX_PATH, batch_size: int = 500, memory_mb: int = 256) -> Dict:
+    """Indexe la table Article par lots (pagination par id) et écrit l'index dans path"""
+    builder = IndexBuilder(path, memory_mb)
+    last_id = ""
+    while True:
+        rows = await db.query_raw(
+            'SELECT id, slug, title, description, content FROM "Article" WHERE id > $1 ORDER BY id LIMIT $2',
+            last_id, batch_size
+        )
+        if not rows:
+            break
+        for row in rows:
+            text = f"{row['title']} {row['description']} {strip_html(row['content'])}"
+            builder.add(row["slug"], row["title"], text)
+        last_id = rows[-1]["id"]
+    return builder.finish()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Index plein texte des articles (BM25, positions, fichier mmap)")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="chemin du fichier d'index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="indexe la table Article")
+    build.add_argument("--batch-size", type=int, default=500)
+    build.add_argument("--memory-mb", type=int, default=256, help="taille des segments en mémoire avant écriture")
+    search = commands.add_parser("search", help="interroge l'index")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=10, help="nombre de résultats")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    if args.command == "search":
+        with SearchIndex(args.index) as index:
+            for score, slug, title in index.search(args.query, args.k):
+                print(f"{score:>8.3f}  {slug}  {title}")
+        return
+
+    from prisma import Prisma
+    db = Prisma()
+    await db.connect()
+    try:
+        stats = await build_from_db(db, args.index, args.batch_size, args.memory_mb)
+    finally:
+        await db.disconnect()
+    print(f"Index : {stats['documents']} articles, {stats['terms']} termes, "
+          f"{stats['bytes'] / 1024 / 1024:.1f} Mo dans {args.index}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
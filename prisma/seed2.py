@@ -1,37 +1,51 @@
+import argparse
 import random
 import asyncio
-import aiohttp
-import aiofiles
 import os
-import unicodedata
-from datetime import datetime
+import time
+from collections import deque
 from prisma import Prisma
-from faker import Faker
-import slugify
-from typing import Dict, List, Optional
-
-# Initialisation Faker en français
-fake = Faker('fr_FR')
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from index_advisor import advise
+from render_artifacts import precompute
+from search_index import DEFAULT_INDEX_PATH, build_from_db
+from seed_assets import DEFAULT_OUTPUT_DIR as DEFAULT_ASSETS_DIR, build_assets, load_manifest, print_report as print_assets_report, rewrite_avatars
+from seed_copy import CopySink
+from seed_checkpoint import DEFAULT_CHECKPOINT_PATH, Checkpoint
+from seed_content import SCIENTIFIC_DOMAINS, fake, generate_article_chunk
+from seed_distributions import Distributions
+from seed_image_cache import DEFAULT_CACHE_DIR, ImageCache
+from seed_images import ImageProvider, make_image_provider
+from seed_metrics import DEFAULT_REPORT_PATH, metrics
+from seed_profiles import DEFAULT_PROFILE, PROFILES, env_int, profile_config
+from seed_slugs import SlugRegistry, create_slug
+from seed_snapshot import SnapshotWriter, import_snapshot
+from seed_writer import AuthorStats, BatchWriter, IdArray, new_id, recompute_author_stats, reset_tables
 
 # Configuration
+# Volumes et tailles de lots : profil SEED_PROFILE (ou --profile), dev par défaut
 CONFIG = {
+    "seed": env_int("SEED_RANDOM_SEED", None),
     "reset_db": True,
-    "nb_authors": 25,
-    "nb_articles": 60,
-    "min_words": 12000,
-    "max_words": 35000,
-    "avatars_dir": "public/avatars",
-    "banners_dir": "public/banners"
+    "profile": DEFAULT_PROFILE,
+    **profile_config(DEFAULT_PROFILE),
+    "concurrency": 8,
+    "workers": os.cpu_count() or 1,
+    "queue_size": 256,
+    "image_provider": os.environ.get("SEED_IMAGE_PROVIDER", "dicebear"),
+    "image_concurrency": 32,
+    "image_cache_dir": DEFAULT_CACHE_DIR,
+    "image_cache_max_mb": 256,
+    "checkpoint_path": DEFAULT_CHECKPOINT_PATH,
+    "report_path": DEFAULT_REPORT_PATH,
+    "search_index_path": DEFAULT_INDEX_PATH,
+    "avatars_dir": os.environ.get("SEED_AVATARS_DIR", "public/avatars"),
+    "banners_dir": os.environ.get("SEED_BANNERS_DIR", "public/banners")
 }
 
 # Données scientifiques
-SCIENTIFIC_DOMAINS = [
-    "Neurosciences", "Intelligence Artificielle", "Physique Quantique",
-    "Biologie Moléculaire", "Climatologie", "Astrophysique", "Génétique",
-    "Informatique", "Mathématiques", "Chimie", "Génie Biomédical",
-    "Psychologie", "Écologie", "Science des Matériaux", "Économie"
-]
-
 ACADEMIC_TITLES = [
     "Professeur", "Professeur Associé", "Professeur Assistant",
     "Chercheur Principal", "Maître de Conférences", "Postdoctorant", "Doctorant"
@@ -65,23 +79,10 @@ TAGS = [
 ]
 
 # Helper functions
-def clean_string(text: str) -> str:
-    """Normalise et supprime les accents"""
-    return unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII')
-
-def create_slug(name: str) -> str:
-    """Crée un slug sans accents"""
-    return slugify.slugify(clean_string(name))
-
 async def reset_database(db: Prisma):
     """Vide complètement la base de données"""
     print("Nettoyage de la base...")
-    await db.component.delete_many()
-    await db.article.delete_many()
-    await db.education.delete_many()
-    await db.author.delete_many()
-    await db.tag.delete_many()
-    await db.category.delete_many()
+    await reset_tables(db)
 
 async def clear_media_files():
     """Supprime les avatars et bannières existants"""
@@ -93,321 +94,431 @@ async def clear_media_files():
                 except Exception as e:
                     print(f"Erreur suppression {file}: {e}")
 
-async def download_image(url: str, path: str):
-    """Télécharge une image depuis une URL"""
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                async with aiofiles.open(path, 'wb') as f:
-                    await f.write(await response.read())
-
 # Génération des données
-async def create_author(db: Prisma) -> Optional[Dict]:
-    """Génère un auteur crédible"""
+async def create_author(writer: BatchWriter, slugs: SlugRegistry, ids: IdArray, created_slugs: IdArray) -> bool:
+    """Génère un auteur crédible ; seuls son id et son slug sont conservés"""
     first_name = fake.first_name()
     last_name = fake.last_name()
     full_name = f"{first_name} {last_name}"
-    slug = create_slug(full_name)
-    
-    # Téléchargement des images
-    avatar_url = f"https://api.dicebear.com/9.x/initials/svg?seed={slug}"
-    banner_url = f"https://api.dicebear.com/9.x/glass/svg?seed={slug}"
-    avatar_path = f"{CONFIG['avatars_dir']}/{slug}.svg"
-    banner_path = f"{CONFIG['banners_dir']}/{slug}.svg"
-    
-    await asyncio.gather(
-        download_image(avatar_url, avatar_path),
-        download_image(banner_url, banner_path)
-    )
+    # Les homonymes sont fréquents : le slug est dédoublonné avant l'insertion
+    slug = slugs.claim(create_slug(full_name))
 
     try:
-        author = await db.author.create(
-            data={
-                "name": full_name,
-                "slug": slug,
-                "title": random.choice(ACADEMIC_TITLES),
-                "affiliation": random.choice(UNIVERSITIES),
-                "bio": fake.paragraph(nb_sentences=5),
-                "expertise": {"set": random.sample(SCIENTIFIC_DOMAINS, k=3)},
-                "email": f"{first_name.lower()}.{last_name.lower()}@univ.fr",
-                "articlesCount": 0,
-                "citations": random.randint(10, 5000),
-                "hIndex": random.randint(1, 50),
-                "avatar": f"/avatars/{slug}.svg"
-            }
-        )
+        # L'id est attribué ici pour que les formations et articles puissent le référencer
+        author = {
+            "id": new_id(),
+            "name": full_name,
+            "slug": slug,
+            "title": random.choice(ACADEMIC_TITLES),
+            "affiliation": random.choice(UNIVERSITIES),
+            "bio": fake.paragraph(nb_sentences=5),
+            "expertise": random.sample(SCIENTIFIC_DOMAINS, k=3),
+            "email": f"{first_name.lower()}.{last_name.lower()}@univ.fr",
+            # Compteurs dérivés des articles, écrits en une passe à la fin du seed
+            "articlesCount": 0,
+            "citations": 0,
+            "hIndex": random.randint(1, 50),
+            "avatar": f"/avatars/{slug}.svg"
+        }
+        await writer.add("author", author)
         
         # Ajout des formations
         for _ in range(random.randint(1, 3)):
-            await db.education.create(
-                data={
-                    "degree": random.choice(DIPLOMES),
-                    "institution": random.choice(UNIVERSITIES),
-                    "year": str(random.randint(1990, 2020)),
-                    "authorId": author.id
-                }
-            )
-            
-        return author
+            await writer.add("education", {
+                "id": new_id(),
+                "degree": random.choice(DIPLOMES),
+                "institution": random.choice(UNIVERSITIES),
+                "year": str(random.randint(1990, 2020)),
+                "authorId": author["id"]
+            })
+
+        ids.append(author["id"])
+        created_slugs.append(slug)
+        return True
     except Exception as e:
         print(f"Erreur création auteur: {e}")
-        return None
-
-def generate_citation() -> str:
-    """Génère une citation bibliographique au format académique"""
-    authors = ", ".join([fake.name() for _ in range(random.randint(1, 4))])
-    year = random.randint(2020, 2025)
-    title = fake.sentence(nb_words=8).rstrip(".")
-    journal = random.choice([
-        "Nature Climate Change",
-        "Science Advances",
-        "Environmental Research Letters",
-        "Global Environmental Change",
-        "Sustainability Science"
-    ])
-    volume = random.randint(1, 50)
-    pages = f"{random.randint(1, 999)}-{random.randint(1000, 1999)}"
-    doi = f"10.{random.randint(1000,9999)}/{fake.slug()}"
-    
-    return f'{authors} ({year}). "{title}". <em>{journal}</em>, {volume}, {pages}. DOI: <a href="https://doi.org/{doi}" class="text-primary hover:underline">{doi}</a>'
-
-def generate_themed_paragraph(theme: str, nb_sentences: int = 10) -> str:
-    """Génère un paragraphe structuré autour d'un thème scientifique"""
-    intro = f"{theme} est un domaine de recherche dynamique qui connaît une croissance constante dans les milieux scientifiques."
-    body = " ".join([fake.sentence() for _ in range(nb_sentences - 2)])
-    conclusion = f"En résumé, {theme.lower()} représente aujourd'hui l'un des axes majeurs de l'innovation scientifique."
-    return f"{intro} {body} {conclusion}"
-
-def generate_html_content() -> str:
-    """Génère un contenu HTML structuré riche en balises et styles typographiques"""
-    theme = random.choice(SCIENTIFIC_DOMAINS)
-
-    def themed_paragraph(style: Optional[str] = None, nb_sentences: int = 8) -> str:
-        intro = f"{theme} est un domaine de recherche dynamique qui connaît une croissance constante dans les milieux scientifiques."
-        body = " ".join([fake.sentence() for _ in range(nb_sentences - 2)])
-        conclusion = f"En résumé, {theme.lower()} représente aujourd'hui l'un des axes majeurs de l'innovation scientifique."
-        content = f"{intro} {body} {conclusion}"
-
-        if style == "lead":
-            return f'<p class="lead text-xl font-medium text-muted-foreground mb-6">{content}</p>'
-        elif style == "large":
-            return f'<p class="text-lg leading-relaxed mb-4">{content}</p>'
-        elif style == "small":
-            return f'<p class="text-sm text-muted-foreground mb-3">{content}</p>'
-        elif style == "muted":
-            return f'<p class="text-muted-foreground mb-4">{content}</p>'
-        else:
-            return f'<p class="mb-4 leading-relaxed">{content}</p>'
-
-    def generate_citation() -> str:
-        """Génère une citation bibliographique au format académique"""
-        authors = ", ".join([fake.name() for _ in range(random.randint(1, 4))])
-        year = random.randint(2020, 2025)
-        title = fake.sentence(nb_words=8).rstrip(".")
-        journal = random.choice([
-            "Nature Climate Change",
-            "Science Advances",
-            "Environmental Research Letters",
-            "Global Environmental Change",
-            "Sustainability Science"
-        ])
-        volume = random.randint(1, 50)
-        pages = f"{random.randint(1, 999)}-{random.randint(1000, 1999)}"
-        doi = f"10.{random.randint(1000,9999)}/{fake.slug()}"
-        
-        return f'{authors} ({year}). "{title}". <em>{journal}</em>, {volume}, {pages}. DOI: <a href="https://doi.org/{doi}" class="text-primary hover:underline">{doi}</a>'
-
-    table_html = """
-    <div class="my-8 overflow-x-auto">
-        <h3 class="text-xl font-semibold mb-4">Tableau Comparatif</h3>
-        <table class="w-full border-collapse">
-            <thead class="bg-muted">
-                <tr>
-                    <th class="border px-4 py-2 text-left">Critère</th>
-                    <th class="border px-4 py-2 text-left">Option A</th>
-                    <th class="border px-4 py-2 text-left">Option B</th>
-                </tr>
-            </thead>
-            <tbody>
-                <tr>
-                    <td class="border px-4 py-2">Efficacité</td>
-                    <td class="border px-4 py-2 font-medium">87%</td>
-                    <td class="border px-4 py-2 font-medium">79%</td>
-                </tr>
-                <tr>
-                    <td class="border px-4 py-2">Précision</td>
-                    <td class="border px-4 py-2 font-medium">91%</td>
-                    <td class="border px-4 py-2 font-medium">84%</td>
-                </tr>
-                <tr>
-                    <td class="border px-4 py-2">Coût</td>
-                    <td class="border px-4 py-2">Modéré</td>
-                    <td class="border px-4 py-2">Élevé</td>
-                </tr>
-            </tbody>
-        </table>
-    </div>
-    """
+        return False
 
-    html_parts = [
-        '<article class="prose prose-slate dark:prose-invert max-w-none">',
-        
-        '<header class="mb-8">',
-        '<h2 class="text-2xl font-bold mb-4">Résumé</h2>',
-        themed_paragraph("lead", 6),
-        '</header>',
-
-        '<section>',
-        '<h2 class="text-2xl font-bold mb-4">Introduction</h2>',
-        themed_paragraph("large", 8),
-        '</section>',
-
-        '<section>',
-        '<h3 class="text-xl font-semibold mb-3">Contexte</h3>',
-        themed_paragraph(),
-        '</section>',
-
-        '<section>',
-        '<h4 class="text-lg font-medium mb-3">Historique</h4>',
-        themed_paragraph("small", 5),
-        '</section>',
-
-        '<section>',
-        '<h2 class="text-2xl font-bold mb-4">Méthodologie</h2>',
-        themed_paragraph(),
-        '<blockquote class="border-l-4 border-primary pl-4 italic my-6">Cette méthodologie repose sur une approche reproductible et rigoureuse des protocoles scientifiques.</blockquote>',
-        '</section>',
-
-        '<section>',
-        '<h2 class="text-2xl font-bold mb-4">Résultats</h2>',
-        themed_paragraph(),
-        table_html,
-        '</section>',
-
-        '<section>',
-        '<h2 class="text-2xl font-bold mb-4">Discussion</h2>',
-        themed_paragraph(),
-        '<ul class="list-disc pl-6 mb-6 space-y-2">' + 
-        "".join(f'<li class="text-muted-foreground">{fake.sentence()}</li>' for _ in range(4)) + 
-        '</ul>',
-        '</section>',
-
-        '<section>',
-        '<h2 class="text-2xl font-bold mb-4">Conclusion</h2>',
-        themed_paragraph("muted", 6),
-        '</section>',
-
-        '<section>',
-        '<h2 class="text-2xl font-bold mb-4">Références</h2>',
-        '<ol class="list-decimal pl-6 space-y-3">' + 
-        "".join(f'<li class="text-muted-foreground">{generate_citation()}</li>' for _ in range(10)) + 
-        '</ol>',
-        '</section>',
-
-        '</article>'
-    ]
-
-    return "\n".join(html_parts)
-
-async def create_article(db: Prisma, author_id: str, category_id: str, tag_ids: List[str]) -> bool:
-    """Crée un article scientifique complet"""
-    title = fake.sentence(nb_words=8).replace('.', '')
-    
+async def create_article(writer: BatchWriter, payload: Dict, slugs: SlugRegistry, author_id: str, category_id: str, tag_ids: List[str]) -> bool:
+    """Crée un article scientifique complet à partir d'un contenu déjà généré"""
     try:
-        await db.article.create(
-            data={
-                "title": title,
-                "slug": create_slug(title),
-                "description": fake.paragraph(nb_sentences=2),
-                "content": generate_html_content(),
-                "publishedAt": fake.date_time_between(start_date='-3y'),
-                "readTime": f"{random.randint(10, 45)} min",
-                "views": random.randint(50, 10000),
-                "featured": random.choice([True, False]),
-                "citations": random.randint(0, 500),  # Random number of citations
-                "authorId": author_id,
-                "categoryId": category_id,
-                "tags": {"connect": [{"id": id} for id in tag_ids]}
-            }
-        )
+        article_id = new_id()
+        slug = slugs.claim(create_slug(payload["title"]))
+        await writer.add("article", {
+            **payload,
+            "id": article_id,
+            "slug": slug,
+            "authorId": author_id,
+            "categoryId": category_id
+        })
+        await writer.add_tags(article_id, tag_ids)
+        # Image d'en-tête, comme dans seed.py ; data est un dict, le writer l'adapte à sa cible
+        await writer.add("component", {
+            "id": new_id(),
+            "type": "image",
+            "data": {"url": f"/articles/{slug}/header.jpg", "alt": payload["title"]},
+            "articleId": article_id
+        })
         return True
     except Exception as e:
         print(f"Erreur création article: {e}")
         return False
 
-async def main():
-    # Initialisation
-    os.makedirs(CONFIG["avatars_dir"], exist_ok=True)
-    os.makedirs(CONFIG["banners_dir"], exist_ok=True)
-    
-    db = Prisma()
-    await db.connect()
+async def produce_articles(queue: asyncio.Queue, count: int, base_seed: int, dataset_seed: int):
+    """Génère les contenus d'articles par lots dans un pool de processus
 
-    # Reset si demandé
-    if CONFIG["reset_db"]:
-        await reset_database(db)
-        await clear_media_files()
+    Le nombre de lots en vol est borné et la file est bornée : si l'écriture
+    en base ralentit, la génération attend au lieu d'accumuler en mémoire.
+    """
+    chunk_size = CONFIG["chunk_size"]
+    # Générateur : la liste des lots ne grandit pas avec le nombre d'articles
+    chunks = (
+        (base_seed + i, min(chunk_size, count - start))
+        for i, start in enumerate(range(0, count, chunk_size))
+    )
+    args = (CONFIG["min_words"], CONFIG["max_words"], dataset_seed)
+
+    try:
+        if CONFIG["workers"] <= 1:
+            for seed, size in chunks:
+                for payload in generate_article_chunk(seed, size, *args):
+                    await queue.put(payload)
+            return
+
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=CONFIG["workers"]) as pool:
+            # Les lots sont consommés dans l'ordre de soumission, pas de fin :
+            # les tirages d'auteurs, de catégories et de slugs en dépendent
+            pending = deque()
+            for seed, size in chunks:
+                pending.append(loop.run_in_executor(pool, generate_article_chunk, seed, size, *args))
+                if len(pending) < CONFIG["workers"] * 2:
+                    continue
+                for payload in await pending.popleft():
+                    await queue.put(payload)
+            while pending:
+                for payload in await pending.popleft():
+                    await queue.put(payload)
+    finally:
+        await queue.put(None)
+
+async def run_pool(job: Callable[[], Awaitable], count: int, concurrency: int) -> int:
+    """Exécute count fois job avec au plus concurrency coroutines actives
+
+    Les résultats ne sont pas conservés ; retourne le nombre de tâches en erreur.
+    """
+    remaining = iter(range(count))
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        # L'itérateur est partagé : chaque worker prend la prochaine tâche libre
+        for _ in remaining:
+            try:
+                await job()
+            except Exception as e:
+                print(f"Erreur tâche: {e}")
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, count)))))
+    return errors
+
+async def create_categories(db: Optional[Prisma], writer) -> List[str]:
+    """Crée les catégories et retourne leurs ids"""
+    if db is None:
+        # Export : pas de base, les ids sont attribués ici
+        ids = []
+        for cat_name in ARTICLE_TYPES:
+            row = {"id": new_id(), "name": cat_name, "slug": create_slug(cat_name)}
+            await writer.add("category", row)
+            ids.append(row["id"])
+        return ids
 
-    # Création des catégories
     categories = []
     for cat_name in ARTICLE_TYPES:
         try:
-            cat = await db.category.create(
-                data={
-                    "name": cat_name,
-                    "slug": create_slug(cat_name)
-                }
-            )
-            categories.append(cat)
+            async with metrics.query("category", "create"):
+                cat = await db.category.create(
+                    data={
+                        "name": cat_name,
+                        "slug": create_slug(cat_name)
+                    }
+                )
+            categories.append(cat.id)
         except Exception:
             # Si la catégorie existe déjà
-            existing = await db.category.find_first(where={"slug": create_slug(cat_name)})
+            async with metrics.query("category", "find_first"):
+                existing = await db.category.find_first(where={"slug": create_slug(cat_name)})
             if existing:
-                categories.append(existing)
+                categories.append(existing.id)
+    return categories
+
+async def create_tags(db: Optional[Prisma], writer) -> List[str]:
+    """Crée les tags et retourne leurs ids"""
+    if db is None:
+        ids = []
+        for tag_name in TAGS:
+            row = {"id": new_id(), "name": tag_name}
+            await writer.add("tag", row)
+            ids.append(row["id"])
+        return ids
 
-    # Création des tags
     tags = []
     for tag_name in TAGS:
         try:
-            tag = await db.tag.upsert(
-                where={"name": tag_name},
-                data={
-                    "create": {"name": tag_name},
-                    "update": {}
-                }
-            )
-            tags.append(tag)
+            async with metrics.query("tag", "upsert"):
+                tag = await db.tag.upsert(
+                    where={"name": tag_name},
+                    data={
+                        "create": {"name": tag_name},
+                        "update": {}
+                    }
+                )
+            tags.append(tag.id)
         except Exception as e:
             print(f"Erreur création tag {tag_name}: {e}")
             continue
+    return tags
+
+def make_images() -> Tuple[ImageProvider, Optional[ImageCache]]:
+    """Fournisseur d'images configuré, avec le cache disque partagé pour DiceBear"""
+    cache = None
+    if CONFIG["image_provider"] == "dicebear":
+        # Les images sont déterministes : après un reset, public/ est repeuplé depuis le cache
+        cache = ImageCache(CONFIG["image_cache_dir"], CONFIG["image_cache_max_mb"] * 1024 * 1024)
+    return make_image_provider(CONFIG["image_provider"], CONFIG["image_concurrency"], cache), cache
+
+async def materialize_images(slugs: IdArray):
+    """Télécharge ou génère en parallèle l'avatar et la bannière de chaque auteur"""
+    provider, cache = make_images()
+    pending = iter(slugs)
+    with metrics.phase("images"):
+        async with provider as images:
+            await run_pool(
+                lambda: images.download_author_images(next(pending), CONFIG["avatars_dir"], CONFIG["banners_dir"]),
+                len(slugs), CONFIG["image_concurrency"]
+            )
+    if cache is not None:
+        print(f"Images : {cache.hits} depuis le cache, {cache.misses} téléchargées.")
+
+async def generate_dataset(db: Optional[Prisma], writer, checkpoint: Optional[Checkpoint] = None, resume: bool = False) -> int:
+    """Génère catégories, tags, auteurs et articles dans writer
+
+    Sans base (db=None), rien n'est lu en base et les images ne sont pas
+    produites : seul le coût de génération est mesuré. Avec resume, seuls
+    les auteurs et articles manquants pour atteindre les cibles sont créés.
+    """
+    with metrics.phase("categories"):
+        categories = await create_categories(db, writer)
+    with metrics.phase("tags"):
+        tags = await create_tags(db, writer)
+
+    nb_authors, nb_articles = CONFIG["nb_authors"], CONFIG["nb_articles"]
+    author_slugs, article_slugs = SlugRegistry(), SlugRegistry()
+    if db is not None and (resume or not CONFIG["reset_db"]):
+        # Base non vide : les slugs existants sont réservés dès le départ
+        await author_slugs.preload(db, "Author")
+        await article_slugs.preload(db, "Article")
+    # Seuls les ids sont gardés pour le tirage des relations, jamais les lignes
+    authors = IdArray()
+    existing_authors = existing_articles = 0
+    if resume:
+        async with metrics.query("author", "select_ids"):
+            authors.extend(row["id"] for row in await db.query_raw('SELECT id FROM "Author"'))
+        existing_authors = len(authors)
+        async with metrics.query("article", "count"):
+            existing_articles = await db.article.count()
+        nb_authors = max(0, nb_authors - existing_authors)
+        nb_articles = max(0, nb_articles - existing_articles)
+        print(f"Reprise : {existing_authors} auteurs et {existing_articles} articles déjà en base, "
+              f"{nb_authors} auteurs et {nb_articles} articles à créer.")
+
+    if checkpoint is not None:
+        if checkpoint.base_seed is None or not resume:
+            checkpoint.base_seed = CONFIG["seed"] if CONFIG["seed"] is not None else random.randrange(2 ** 32)
+        checkpoint.phases = {"authors": existing_authors, "articles": existing_articles}
+
+        def on_articles(rows: List[Dict]):
+            checkpoint.advance("articles", len(rows))
+            checkpoint.capture(random=random, faker=fake.random)
+            checkpoint.save()
+
+        writer.on_written("author", lambda rows: checkpoint.advance("authors", len(rows)))
+        writer.on_written("article", on_articles)
+        base_seed = checkpoint.base_seed
+    else:
+        base_seed = CONFIG["seed"] if CONFIG["seed"] is not None else random.randrange(2 ** 32)
 
     # Création des auteurs
-    authors = []
-    for _ in range(CONFIG["nb_authors"]):
-        author = await create_author(db)
-        if author:
-            authors.append(author)
-
-    # Création des articles
-    success_count = 0
-    for _ in range(CONFIG["nb_articles"]):
-        if not authors or not categories or not tags:
-            break
-            
-        author = random.choice(authors)
-        category = random.choice(categories)
-        selected_tags = random.sample(tags, k=min(3, len(tags)))
-        
-        if await create_article(db, author.id, category.id, [t.id for t in selected_tags]):
-            success_count += 1
-            # Mise à jour du compteur d'articles
-            await db.author.update(
-                where={"id": author.id},
-                data={"articlesCount": {"increment": 1}}
-            )
+    new_slugs = IdArray()
+    with metrics.phase("authors"):
+        await run_pool(lambda: create_author(writer, author_slugs, authors, new_slugs), nb_authors, CONFIG["concurrency"])
+        await writer.flush()
+    if writer.failed_ids:
+        authors = authors.without(writer.failed_ids)
+
+    # Images des nouveaux auteurs, inutiles pour un export
+    if db is not None:
+        await materialize_images(new_slugs)
+    if checkpoint is not None:
+        checkpoint.capture(random=random, faker=fake.random)
+        checkpoint.save()
+
+    # Génération multi-processus, écriture au fil de l'eau
+    with metrics.phase("articles"):
+        await generate_articles(writer, authors, categories, tags, article_slugs, nb_articles, base_seed, existing_articles)
+    return writer.written["article"]
+
+async def generate_articles(writer, authors: IdArray, categories: List[str], tags: List[str],
+                            slugs: SlugRegistry, nb_articles: int, base_seed: int, offset: int = 0):
+    """Relie les contenus produits par le pool aux auteurs, catégories et tags
+
+    Les relations suivent des lois asymétriques (auteurs et catégories selon
+    Zipf, tags par thèmes) pour reproduire les clés chaudes d'un vrai trafic.
+    """
+    if authors and categories and tags and nb_articles:
+        dist = Distributions(random, len(authors), len(categories), len(tags))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=CONFIG["queue_size"])
+        # Décaler les graines pour ne pas régénérer les lots déjà écrits
+        producer = asyncio.create_task(produce_articles(queue, nb_articles, base_seed + offset, base_seed))
+        # Relations tirées par blocs d'un lot de génération
+        draws = iter(())
+        while (payload := await queue.get()) is not None:
+            draw = next(draws, None)
+            if draw is None:
+                draws = dist.draw(CONFIG["chunk_size"])
+                draw = next(draws)
+            author_index, category_index, tag_indices = draw
+            selected_tags = [tags[i] for i in tag_indices]
+            await create_article(writer, payload, slugs, authors[author_index], categories[category_index], selected_tags)
+        await producer
+    await writer.flush()
+
+async def export_dataset(path: str):
+    """Génère le jeu de données dans un snapshot, sans base de données"""
+    writer = SnapshotWriter(path)
+    start = time.perf_counter()
+    try:
+        count = await generate_dataset(None, writer)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    print(f"Export terminé ! {count} articles en {elapsed:.1f}s ({count / elapsed:.0f} articles/s) dans {path}")
+    metrics.write(CONFIG["report_path"])
+
+async def import_dataset(db: Prisma, writer, path: str) -> int:
+    """Charge un snapshot en base et produit les images de ses auteurs"""
+    slugs = IdArray()
+    writer.on_written("author", lambda rows: slugs.extend(r["slug"] for r in rows))
+    with metrics.phase("import"):
+        read = await import_snapshot(path, writer)
+    print(f"Snapshot lu : {read['author']} auteurs, {read['article']} articles.")
+    await materialize_images(slugs)
+    return writer.written["article"]
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Peuple la base avec des données scientifiques factices")
+    parser.add_argument("--optimize-assets", action="store_true", help="minifie, déduplique et précompresse avatars et bannières après le seed")
+    parser.add_argument("--render-artifacts", action="store_true", help="précalcule extraits, tables des matières et temps de lecture après le seed")
+    parser.add_argument("--search-index", action="store_true", help="construit l'index plein texte des articles après le seed")
+    parser.add_argument("--advise-indexes", action="store_true", help="analyse les plans des requêtes du site après le seed et propose des index")
+    parser.add_argument("--profile", choices=list(PROFILES), help=f"volumes à générer (défaut : SEED_PROFILE ou {DEFAULT_PROFILE})")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--export", metavar="FICHIER", help="génère le jeu de données dans un snapshot .jsonl.gz sans toucher la base")
+    mode.add_argument("--import", dest="import_path", metavar="FICHIER", help="charge un snapshot en base sans rien générer")
+    mode.add_argument("--recompute-stats", action="store_true", help="recalcule articlesCount et citations des auteurs depuis les articles existants")
+    mode.add_argument("--incremental", action="store_true", help="reprend depuis le checkpoint et complète la base jusqu'aux cibles, sans reset")
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    if args.profile:
+        CONFIG.update(profile=args.profile, **profile_config(args.profile))
+    print(f"Profil {CONFIG['profile']} : {CONFIG['nb_authors']} auteurs, {CONFIG['nb_articles']} articles, sink {CONFIG['sink']}")
+
+    # Initialisation
+    if CONFIG["seed"] is not None:
+        random.seed(CONFIG["seed"])
+        fake.seed_instance(CONFIG["seed"])
+
+    if args.export:
+        await export_dataset(args.export)
+        return
+
+    os.makedirs(CONFIG["avatars_dir"], exist_ok=True)
+    os.makedirs(CONFIG["banners_dir"], exist_ok=True)
+    
+    db = Prisma()
+    await db.connect()
+
+    if args.recompute_stats:
+        start = time.perf_counter()
+        updated = await recompute_author_stats(db)
+        print(f"Statistiques recalculées pour {updated} auteurs en {time.perf_counter() - start:.2f}s")
+        await db.disconnect()
+        return
+
+    # Reset si demandé, jamais en mode incrémental
+    if args.incremental:
+        checkpoint = Checkpoint.load(CONFIG["checkpoint_path"])
+        if checkpoint.restore(random=random, faker=fake.random):
+            print(f"Checkpoint chargé depuis {CONFIG['checkpoint_path']}")
+    else:
+        checkpoint = Checkpoint(CONFIG["checkpoint_path"])
+        if CONFIG["reset_db"]:
+            with metrics.phase("reset"):
+                await reset_database(db)
+                await clear_media_files()
+
+    # Écriture par create_many (Prisma) ou par COPY directement dans PostgreSQL
+    if CONFIG["sink"] == "copy":
+        writer = CopySink(CONFIG["copy_batch_size"])
+        await writer.open()
+    else:
+        writer = BatchWriter(db, CONFIG["batch_size"], skip_duplicates=args.incremental)
+    stats = AuthorStats()
+    writer.on_written("article", stats.add_articles)
+
+    try:
+        if args.import_path:
+            success_count = await import_dataset(db, writer, args.import_path)
+        else:
+            success_count = await generate_dataset(db, writer, checkpoint, resume=args.incremental)
+    finally:
+        if isinstance(writer, CopySink):
+            await writer.close()
+
+    # Compteurs dérivés : une seule passe pour tous les auteurs. En reprise, les
+    # articles d'un run interrompu n'ont jamais été comptés : on recalcule tout
+    with metrics.phase("stats"):
+        if args.incremental:
+            await recompute_author_stats(db)
+        else:
+            await stats.write(db)
 
     print(f"Terminé ! {success_count} articles créés.")
+    if args.optimize_assets:
+        with metrics.phase("assets"):
+            assets = await asyncio.to_thread(
+                build_assets, {"avatars": CONFIG["avatars_dir"], "banners": CONFIG["banners_dir"]}
+            )
+        print_assets_report(assets, DEFAULT_ASSETS_DIR)
+        updated = await rewrite_avatars(db, load_manifest(DEFAULT_ASSETS_DIR))
+        print(f"Author.avatar mis à jour pour {updated} auteurs")
+    if args.render_artifacts:
+        with metrics.phase("render_artifacts"):
+            rendered = await precompute(db, CONFIG["batch_size"])
+        print(f"Artefacts de rendu : {rendered['updated']} articles retraités sur {rendered['articles']}")
+    if args.search_index:
+        with metrics.phase("search_index"):
+            index = await build_from_db(db, CONFIG["search_index_path"], CONFIG["batch_size"])
+        print(f"Index de recherche : {index['documents']} articles, {index['terms']} termes dans {CONFIG['search_index_path']}")
+    metrics.write(CONFIG["report_path"])
     await db.disconnect()
 
+    # Analyse des plans sur les données fraîches, hors des métriques du seed
+    if args.advise_indexes:
+        await advise()
+
 if __name__ == "__main__":
     asyncio.run(main())
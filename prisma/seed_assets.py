@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optionnel : sans brotli, seules les variantes .gz sont écrites
+    brotli = None
+
+DEFAULT_OUTPUT_DIR = os.environ.get("SEED_ASSETS_DIR", "public/assets")
+# Préfixe d'URL des fichiers de DEFAULT_OUTPUT_DIR, servis par Next depuis public/
+DEFAULT_URL_PREFIX = "/assets"
+DEFAULT_SOURCES = {"avatars": "public/avatars", "banners": "public/banners"}
+MANIFEST_NAME = "manifest.json"
+HASH_CHARS = 16
+
+COMMENT_RE = re.compile(r"<!--.*?-->|<\?xml.*?\?>", re.S)
+# Métadonnées RDF de DiceBear : licence CC0, aucune attribution requise
+METADATA_RE = re.compile(r"<metadata\b.*?</metadata>", re.S)
+BETWEEN_TAGS_RE = re.compile(r">\s+<")
+SPACES_RE = re.compile(r"\s{2,}")
+SELF_CLOSING_RE = re.compile(r"\s+/>")
+TAG_RE = re.compile(r"<[^>]+>")
+# Fichiers produits ici : nom haché, variantes précompressées et temporaires
+HASHED_RE = re.compile(rf"^[0-9a-f]{{{HASH_CHARS}}}\.svg(\.gz|\.br)?(\.\d+\.\d+\.tmp)?$")
+# Zéros inutiles des décimales, dans les balises seulement : "17.800" -> "17.8", "1.0" -> "1"
+DECIMAL_RE = re.compile(r'(?<=[\s"(,])(-?\d+)\.(\d*?)0+(?=[\s",)%])')
+
+
+def _trim_decimal(match: re.Match) -> str:
+    return f"{match.group(1)}.{match.group(2)}" if match.group(2) else match.group(1)
+
+
+def minify_svg(svg: str) -> str:
+    """Réduit un SVG sans changer son rendu : commentaires, métadonnées et blancs retirés"""
+    svg = COMMENT_RE.sub("", svg)
+    svg = METADATA_RE.sub("", svg)
+    svg = BETWEEN_TAGS_RE.sub("><", svg)
+    svg = SELF_CLOSING_RE.sub("/>", svg)
+    svg = SPACES_RE.sub(" ", svg)
+    svg = TAG_RE.sub(lambda tag: DECIMAL_RE.sub(_trim_decimal, tag.group(0)), svg)
+    return svg.strip()
+
+
+def _write_atomic(path: str, data: bytes):
+    # Un nom temporaire par thread : deux sources identiques peuvent viser le même fichier
+    tmp_path = f"{path}.{os.getpid()}.{id(data)}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_variants(path: str, data: bytes) -> Dict[str, int]:
+    """Écrit le fichier et ses variantes précompressées, si elles sont plus petites"""
+    sizes = {"bytes": len(data)}
+    if not os.path.exists(path):
+        _write_atomic(path, data)
+    # mtime=0 : même contenu, même .gz, d'un run à l'autre
+    variants = [("gzip", ".gz", lambda: gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        variants.append(("br", ".br", lambda: brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)))
+    for name, suffix, compress in variants:
+        if os.path.exists(path + suffix):
+            sizes[name] = os.path.getsize(path + suffix)
+            continue
+        compressed = compress()
+        if len(compressed) < len(data):
+            _write_atomic(path + suffix, compressed)
+            sizes[name] = len(compressed)
+    return sizes
+
+
+def process_file(source: str, output_dir: str) -> Tuple[str, int, Dict[str, int]]:
+    """Minifie source et l'écrit sous un nom dérivé de son contenu
+
+    Retourne le nom haché, la taille d'origine et les tailles écrites ; un
+    fichier déjà présent sous ce nom n'est pas réécrit.
+    """
+    with open(source, "r", encoding="utf-8") as f:
+        original = f.read()
+    data = minify_svg(original).encode("utf-8")
+    name = f"{hashlib.sha256(data).hexdigest()[:HASH_CHARS]}.svg"
+    return name, len(original.encode("utf-8")), _write_variants(os.path.join(output_dir, name), data)
+
+
+def _prune(output_dir: str, keep: set) -> int:
+    """Supprime les fichiers hachés qui ne sont plus référencés par le manifeste
+
+    Les autres fichiers du dossier ne sont jamais touchés.
+    """
+    removed = 0
+    for entry in os.listdir(output_dir):
+        if not HASHED_RE.match(entry) or entry.split(".", 1)[0] + ".svg" in keep:
+            continue
+        os.remove(os.path.join(output_dir, entry))
+        removed += 1
+    return removed
+
+
+def build_assets(sources: Optional[Dict[str, str]] = None, output_dir: str = DEFAULT_OUTPUT_DIR,
+                 url_prefix: str = DEFAULT_URL_PREFIX, workers: Optional[int] = None) -> Dict:
+    """Traite en parallèle les SVG de chaque dossier source et écrit le manifeste
+
+    Le manifeste associe, par type d'image, chaque slug à l'URL de son fichier
+    haché, que le serveur peut mettre en cache indéfiniment.
+    """
+    sources = sources or DEFAULT_SOURCES
+    os.makedirs(output_dir, exist_ok=True)
+    jobs: List[Tuple[str, str, str]] = []
+    for kind, folder in sources.items():
+        if not os.path.isdir(folder):
+            continue
+        for entry in sorted(os.listdir(folder)):
+            if entry.endswith(".svg"):
+                jobs.append((kind, entry[:-len(".svg")], os.path.join(folder, entry)))
+
+    with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) * 4)) as pool:
+        results = list(pool.map(lambda job: process_file(job[2], output_dir), jobs))
+
+    manifest: Dict[str, Dict[str, str]] = {kind: {} for kind in sources}
+    files: Dict[str, Dict[str, int]] = {}
+    original_bytes = 0
+    for (kind, slug, _), (name, size, sizes) in zip(jobs, results):
+        manifest[kind][slug] = f"{url_prefix}/{name}"
+        files[name] = sizes
+        original_bytes += size
+
+    _write_atomic(os.path.join(output_dir, MANIFEST_NAME),
+                  json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+    return {
+        "sources": len(jobs),
+        "files": len(files),
+        "removed": _prune(output_dir, set(files)),
+        "original_bytes": original_bytes,
+        "minified_bytes": sum(sizes["bytes"] for sizes in files.values()),
+        "gzip_bytes": sum(sizes.get("gzip", sizes["bytes"]) for sizes in files.values()),
+        "br_bytes": sum(sizes.get("br", sizes["bytes"]) for sizes in files.values()) if brotli else None,
+    }
+
+
+def load_manifest(output_dir: str = DEFAULT_OUTPUT_DIR) -> Dict[str, Dict[str, str]]:
+    with open(os.path.join(output_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+async def rewrite_avatars(db, manifest: Dict[str, Dict[str, str]], chunk_size: int = 10000) -> int:
+    """Fait pointer Author.avatar vers les fichiers hachés du manifeste
+
+    Les pages lisent author.avatar : sans cette étape, elles continueraient de
+    charger les SVG d'origine de public/avatars.
+    """
+    avatars = list(manifest.get("avatars", {}).items())
+    updated = 0
+    for start in range(0, len(avatars), chunk_size):
+        chunk = avatars[start:start + chunk_size]
+        values = ", ".join(f"(${i * 2 + 1}::text, ${i * 2 + 2}::text)" for i in range(len(chunk)))
+        updated += await db.execute_raw(
+            f'UPDATE "Author" AS a SET avatar = v.avatar FROM (VALUES {values}) AS v(slug, avatar) '
+            'WHERE a.slug = v.slug AND a.avatar IS DISTINCT FROM v.avatar',
+            *[value for pair in chunk for value in pair]
+        )
+    return updated
+
+
+def print_report(stats: Dict, output_dir: str):
+    print(f"Assets : {stats['sources']} SVG, {stats['files']} fichiers uniques dans {output_dir} "
+          f"({stats['removed']} obsolètes supprimés)")
+    line = (f"  {stats['original_bytes'] / 1024:.1f} Ko -> {stats['minified_bytes'] / 1024:.1f} Ko minifiés, "
+            f"{stats['gzip_bytes'] / 1024:.1f} Ko en gzip")
+    if stats["br_bytes"] is not None:
+        line += f", {stats['br_bytes'] / 1024:.1f} Ko en brotli"
+    print(line)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Minifie, déduplique et précompresse avatars et bannières")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="dossier des fichiers hachés et du manifeste")
+    parser.add_argument("--url-prefix", default=DEFAULT_URL_PREFIX, help="préfixe d'URL des fichiers dans le manifeste")
+    parser.add_argument("--workers", type=int, help="threads de traitement")
+    parser.add_argument("--rewrite-avatars", action="store_true", help="met à jour Author.avatar en base depuis le manifeste")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    start = time.perf_counter()
+    stats = build_assets(output_dir=args.output, url_prefix=args.url_prefix, workers=args.workers)
+    print_report(stats, args.output)
+    print(f"  en {time.perf_counter() - start:.2f}s")
+    if not args.rewrite_avatars:
+        return
+
+    from prisma import Prisma
+    db = Prisma()
+    await db.connect()
+    try:
+        updated = await rewrite_avatars(db, load_manifest(args.output))
+    finally:
+        await db.disconnect()
+    print(f"Author.avatar mis à jour pour {updated} auteurs")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
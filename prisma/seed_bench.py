@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_BASELINE_PATH = os.environ.get("SEED_BENCH_BASELINE", ".cache/seed-bench-baseline.json")
+
+PRISMA_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(PRISMA_DIR)
+MIGRATIONS_DIR = os.path.join(PRISMA_DIR, "migrations")
+
+# Points de mesure : nom -> nombre d'articles
+SCALES: Dict[str, int] = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+}
+
+# Réglages PostgreSQL d'une base jetable : la durabilité ne sert à rien ici
+POSTGRES_OPTIONS = [
+    "-c", "fsync=off",
+    "-c", "synchronous_commit=off",
+    "-c", "full_page_writes=off",
+    "-c", "max_wal_size=4GB",
+]
+
+
+def postgres_bin(name: str) -> str:
+    """Chemin d'un binaire PostgreSQL (PG_BIN, PATH puis pg_config --bindir)"""
+    if os.environ.get("PG_BIN"):
+        return os.path.join(os.environ["PG_BIN"], name)
+    path = shutil.which(name)
+    if path:
+        return path
+    pg_config = shutil.which("pg_config")
+    if pg_config:
+        bindir = subprocess.run([pg_config, "--bindir"], capture_output=True, text=True, check=True).stdout.strip()
+        if os.path.exists(os.path.join(bindir, name)):
+            return os.path.join(bindir, name)
+    raise RuntimeError(f"{name} introuvable : installez PostgreSQL ou définissez PG_BIN")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalPostgres:
+    """Instance PostgreSQL temporaire (initdb + pg_ctl), supprimée à la sortie
+
+    Le schéma est créé en rejouant les migrations Prisma avec psql, sans
+    passer par la CLI Prisma ni le réseau.
+    """
+
+    def __init__(self, database: str = "blog"):
+        self.database = database
+        self.root: Optional[str] = None
+        self.port: Optional[int] = None
+
+    @property
+    def url(self) -> str:
+        return f"postgresql://postgres@127.0.0.1:{self.port}/{self.database}"
+
+    def __enter__(self) -> "LocalPostgres":
+        self.root = tempfile.mkdtemp(prefix="seed-bench-pg-")
+        self.port = free_port()
+        data_dir = os.path.join(self.root, "data")
+        options = " ".join(["-p", str(self.port), "-k", self.root, "-c", "listen_addresses=127.0.0.1"] + POSTGRES_OPTIONS)
+        try:
+            subprocess.run(
+                [postgres_bin("initdb"), "-D", data_dir, "-U", "postgres", "-A", "trust", "-E", "UTF8", "--no-locale"],
+                check=True, stdout=subprocess.DEVNULL
+            )
+            subprocess.run(
+                [postgres_bin("pg_ctl"), "-D", data_dir, "-o", options, "-l", os.path.join(self.root, "postgres.log"), "-w", "start"],
+                check=True, stdout=subprocess.DEVNULL
+            )
+            self.psql("postgres", "-c", f'CREATE DATABASE "{self.database}"')
+            for migration in sorted(os.listdir(MIGRATIONS_DIR)):
+                path = os.path.join(MIGRATIONS_DIR, migration, "migration.sql")
+                if os.path.exists(path):
+                    self.psql(self.database, "-f", path)
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        data_dir = os.path.join(self.root, "data")
+        if os.path.exists(os.path.join(data_dir, "postmaster.pid")):
+            subprocess.run([postgres_bin("pg_ctl"), "-D", data_dir, "-m", "fast", "-w", "stop"], stdout=subprocess.DEVNULL)
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def psql(self, database: str, *args: str):
+        subprocess.run(
+            [postgres_bin("psql"), "-q", "-v", "ON_ERROR_STOP=1", "-h", "127.0.0.1", "-p", str(self.port),
+             "-U", "postgres", "-d", database, *args],
+            check=True, stdout=subprocess.DEVNULL
+        )
+
+
+def run_scale(db: LocalPostgres, name: str, articles: int, args: argparse.Namespace, work_dir: str) -> Dict:
+    """Lance seed2.py dans un processus séparé et lit son rapport de métriques"""
+    report_path = os.path.join(work_dir, f"report-{name}.json")
+    env = dict(
+        os.environ,
+        DATABASE_URL=db.url,
+        SEED_SINK=args.sink,
+        SEED_IMAGE_PROVIDER="local",
+        SEED_RANDOM_SEED=str(args.seed),
+        SEED_NB_ARTICLES=str(articles),
+        SEED_NB_AUTHORS=str(max(25, articles // args.articles_per_author)),
+        SEED_MIN_WORDS=str(args.min_words),
+        SEED_MAX_WORDS=str(args.max_words),
+        SEED_AVATARS_DIR=os.path.join(work_dir, "avatars"),
+        SEED_BANNERS_DIR=os.path.join(work_dir, "banners"),
+        SEED_CHECKPOINT=os.path.join(work_dir, "checkpoint.json"),
+        SEED_REPORT=report_path,
+    )
+    log_path = os.path.join(work_dir, f"seed-{name}.log")
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        process = subprocess.run(
+            [sys.executable, os.path.join(PRISMA_DIR, "seed2.py")],
+            cwd=ROOT_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+    wall = time.perf_counter() - start
+    if process.returncode != 0:
+        with open(log_path, "r", encoding="utf-8") as log:
+            print("".join(log.readlines()[-30:]))
+        raise RuntimeError(f"seed2.py a échoué pour {name} (code {process.returncode})")
+
+    with open(report_path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    rss = report.get("peak_rss_mb", {})
+    return {
+        "articles": articles,
+        "total_s": report["total_s"],
+        "wall_s": round(wall, 3),
+        "rows": sum(report["rows"].values()),
+        "rows_per_s": report["rows_per_s"],
+        "peak_rss_mb": round(rss.get("self", 0) + rss.get("children", 0), 1),
+        "phases": {phase: p["seconds"] for phase, p in report["phases"].items()},
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Compare les durées au baseline ; renvoie la liste des régressions"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            print(f"  {name:<6} pas de référence")
+            continue
+        ratio = result["total_s"] / reference["total_s"] if reference["total_s"] else 1.0
+        status = "OK"
+        if ratio > 1 + threshold:
+            status = "RÉGRESSION"
+            regressions.append(f"{name} : {result['total_s']:.2f}s contre {reference['total_s']:.2f}s (x{ratio:.2f})")
+        print(f"  {name:<6} {result['total_s']:>9.2f}s  référence {reference['total_s']:>9.2f}s  x{ratio:.2f}  {status}")
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Mesure le débit de seed2.py sur une base PostgreSQL jetable")
+    parser.add_argument("--scales", default=",".join(SCALES), help=f"points de mesure parmi {', '.join(SCALES)}")
+    parser.add_argument("--sink", choices=["prisma", "copy"], default="prisma", help="mode d'écriture de seed2.py")
+    parser.add_argument("--seed", type=int, default=42, help="graine fixe, pour comparer des runs identiques")
+    parser.add_argument("--min-words", type=int, default=300, help="taille minimale des articles générés")
+    parser.add_argument("--max-words", type=int, default=900, help="taille maximale des articles générés")
+    parser.add_argument("--articles-per-author", type=int, default=40)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="fichier JSON des mesures de référence")
+    parser.add_argument("--threshold", type=float, default=0.15, help="ralentissement toléré avant échec (0.15 = 15 %%)")
+    parser.add_argument("--update-baseline", action="store_true", help="enregistre ce run comme nouvelle référence")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    names = [name.strip() for name in args.scales.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCALES]
+    if unknown:
+        print(f"Points de mesure inconnus : {', '.join(unknown)}")
+        return 2
+
+    results: Dict[str, Dict] = {}
+    work_dir = tempfile.mkdtemp(prefix="seed-bench-")
+    try:
+        with LocalPostgres() as db:
+            print(f"PostgreSQL jetable sur le port {db.port}")
+            for name in names:
+                # Chaque point repart d'une base vide (seed2 fait le reset)
+                result = run_scale(db, name, SCALES[name], args, work_dir)
+                results[name] = result
+                print(f"{name:<6} {result['total_s']:>9.2f}s  {result['rows']:>9} lignes  "
+                      f"{result['rows_per_s']:>10.1f} lignes/s  {result['peak_rss_mb']:>8.1f} Mo")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    # Une référence n'a de sens que pour les mêmes paramètres de génération
+    key = f"{args.sink}:{args.seed}:{args.min_words}-{args.max_words}:{args.articles_per_author}"
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        stored = {}
+
+    if args.update_baseline:
+        stored.setdefault(key, {}).update(results)
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2)
+        print(f"Référence enregistrée dans {args.baseline}")
+        return 0
+
+    if key not in stored:
+        print(f"Aucune référence pour {key} dans {args.baseline} (relancer avec --update-baseline)")
+        return 0
+    print(f"Comparaison avec {args.baseline} (seuil {args.threshold:.0%}) :")
+    regressions = compare(results, stored[key], args.threshold)
+    for regression in regressions:
+        print(f"Régression : {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import json
+import os
+import random
+from typing import Dict, Optional
+
+DEFAULT_CHECKPOINT_PATH = os.environ.get("SEED_CHECKPOINT", ".cache/seed-checkpoint.json")
+
+
+def _encode_state(state: tuple) -> list:
+    version, internal, gauss_next = state
+    return [version, list(internal), gauss_next]
+
+
+def _decode_state(state: list) -> tuple:
+    version, internal, gauss_next = state
+    return (version, tuple(internal), gauss_next)
+
+
+class Checkpoint:
+    """Progression d'un seed : compteurs par phase, graine de base et états RNG
+
+    Permet de reprendre un seed interrompu là où il s'est arrêté, en
+    poursuivant la même séquence aléatoire au lieu de la rejouer.
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH):
+        self.path = path
+        self.phases: Dict[str, int] = {}
+        self.base_seed: Optional[int] = None
+        self.rng: Dict[str, list] = {}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_CHECKPOINT_PATH) -> "Checkpoint":
+        """Charge un checkpoint existant, ou en crée un vide"""
+        checkpoint = cls(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return checkpoint
+        checkpoint.phases = data.get("phases", {})
+        checkpoint.base_seed = data.get("base_seed")
+        checkpoint.rng = data.get("rng", {})
+        return checkpoint
+
+    def save(self):
+        """Écrit le checkpoint de manière atomique"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"phases": self.phases, "base_seed": self.base_seed, "rng": self.rng}, f)
+        os.replace(tmp_path, self.path)
+
+    def capture(self, **generators: random.Random):
+        """Mémorise l'état des générateurs (par exemple random=random, faker=fake.random)"""
+        for name, generator in generators.items():
+            self.rng[name] = _encode_state(generator.getstate())
+
+    def restore(self, **generators: random.Random) -> bool:
+        """Restaure l'état des générateurs connus ; False si rien n'a été restauré"""
+        restored = False
+        for name, generator in generators.items():
+            if name in self.rng:
+                generator.setstate(_decode_state(self.rng[name]))
+                restored = True
+        return restored
+
+    def advance(self, phase: str, count: int):
+        self.phases[phase] = self.phases.get(phase, 0) + count
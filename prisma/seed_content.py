@@ -0,0 +1,253 @@
+import hashlib
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from faker import Faker
+
+from seed_distributions import PublishingBursts, article_citations, article_views, publishing_bursts
+from seed_slugs import create_slug
+from seed_text import TextEngine
+
+# Initialisation Faker en français ; le texte courant passe par le moteur de mots
+fake = Faker('fr_FR')
+text = TextEngine()
+# Générateur propre au contenu : resemer un lot ne touche ni au random global
+# ni à fake, que le processus principal utilise pour les auteurs et les tirages
+rng = random.Random()
+
+# Vitesse de lecture moyenne utilisée pour readTime
+WORDS_PER_MINUTE = 230
+
+# Données scientifiques
+SCIENTIFIC_DOMAINS = [
+    "Neurosciences", "Intelligence Artificielle", "Physique Quantique",
+    "Biologie Moléculaire", "Climatologie", "Astrophysique", "Génétique",
+    "Informatique", "Mathématiques", "Chimie", "Génie Biomédical",
+    "Psychologie", "Écologie", "Science des Matériaux", "Économie"
+]
+
+def generate_citation() -> str:
+    """Génère une citation bibliographique au format académique"""
+    return text.citation()
+
+def generate_themed_paragraph(theme: str, nb_sentences: int = 10) -> str:
+    """Génère un paragraphe structuré autour d'un thème scientifique"""
+    intro = f"{theme} est un domaine de recherche dynamique qui connaît une croissance constante dans les milieux scientifiques."
+    body = " ".join(text.sentences(nb_sentences - 2))
+    conclusion = f"En résumé, {theme.lower()} représente aujourd'hui l'un des axes majeurs de l'innovation scientifique."
+    return f"{intro} {body} {conclusion}"
+
+TABLE_HTML = """
+    <div class="my-8 overflow-x-auto">
+        <h3 id="tableau-comparatif" class="text-xl font-semibold mb-4">Tableau Comparatif</h3>
+        <table class="w-full border-collapse">
+            <thead class="bg-muted">
+                <tr>
+                    <th class="border px-4 py-2 text-left">Critère</th>
+                    <th class="border px-4 py-2 text-left">Option A</th>
+                    <th class="border px-4 py-2 text-left">Option B</th>
+                </tr>
+            </thead>
+            <tbody>
+                <tr>
+                    <td class="border px-4 py-2">Efficacité</td>
+                    <td class="border px-4 py-2 font-medium">87%</td>
+                    <td class="border px-4 py-2 font-medium">79%</td>
+                </tr>
+                <tr>
+                    <td class="border px-4 py-2">Précision</td>
+                    <td class="border px-4 py-2 font-medium">91%</td>
+                    <td class="border px-4 py-2 font-medium">84%</td>
+                </tr>
+                <tr>
+                    <td class="border px-4 py-2">Coût</td>
+                    <td class="border px-4 py-2">Modéré</td>
+                    <td class="border px-4 py-2">Élevé</td>
+                </tr>
+            </tbody>
+        </table>
+    </div>
+    """
+
+HEADING_CLASSES = {
+    "h2": "text-2xl font-bold mb-4",
+    "h3": "text-xl font-semibold mb-3",
+    "h4": "text-lg font-medium mb-3"
+}
+
+PARAGRAPH_CLASSES = {
+    "lead": "lead text-xl font-medium text-muted-foreground mb-6",
+    "large": "text-lg leading-relaxed mb-4",
+    "small": "text-sm text-muted-foreground mb-3",
+    "muted": "text-muted-foreground mb-4",
+    None: "mb-4 leading-relaxed"
+}
+
+# Sections ajoutées après les résultats jusqu'à atteindre la longueur visée
+EXTRA_SECTIONS = [
+    "Analyse Complémentaire", "Protocole Expérimental", "Analyse Statistique",
+    "Étude de Cas", "Validation", "Limites de l'Étude", "Perspectives"
+]
+
+def iter_html_content(target_words: int) -> Iterator[Tuple[str, int]]:
+    """Produit le corps HTML fragment par fragment, avec le nombre de mots de chacun
+
+    Les sections supplémentaires sont ajoutées tant que target_words n'est pas
+    atteint ; le compte est tenu au fil de l'eau sans relire le HTML produit.
+    """
+    theme = rng.choice(SCIENTIFIC_DOMAINS)
+    words = [0]
+    anchors = set()
+
+    def themed_paragraph(style: Optional[str] = None, nb_sentences: int = 8) -> Tuple[str, int]:
+        intro = f"{theme} est un domaine de recherche dynamique qui connaît une croissance constante dans les milieux scientifiques."
+        body = " ".join(text.sentences(nb_sentences - 2))
+        conclusion = f"En résumé, {theme.lower()} représente aujourd'hui l'un des axes majeurs de l'innovation scientifique."
+        content = f"{intro} {body} {conclusion}"
+        return f'<p class="{PARAGRAPH_CLASSES[style]}">{content}</p>', content.count(" ") + 1
+
+    def heading(tag: str, title: str) -> Tuple[str, int]:
+        # id unique dans l'article : cible des liens de la table des matières
+        anchor = base = create_slug(title)
+        suffix = 2
+        while anchor in anchors:
+            anchor = f"{base}-{suffix}"
+            suffix += 1
+        anchors.add(anchor)
+        return f'<{tag} id="{anchor}" class="{HEADING_CLASSES[tag]}">{title}</{tag}>', title.count(" ") + 1
+
+    def fragments() -> Iterator[Tuple[str, int]]:
+        yield '<article class="prose prose-slate dark:prose-invert max-w-none">', 0
+
+        yield '<header class="mb-8">', 0
+        yield heading("h2", "Résumé")
+        yield themed_paragraph("lead", 6)
+        yield '</header>', 0
+
+        yield '<section>', 0
+        yield heading("h2", "Introduction")
+        yield themed_paragraph("large", 8)
+        yield '</section>', 0
+
+        yield '<section>', 0
+        yield heading("h3", "Contexte")
+        yield themed_paragraph()
+        yield '</section>', 0
+
+        yield '<section>', 0
+        yield heading("h4", "Historique")
+        yield themed_paragraph("small", 5)
+        yield '</section>', 0
+
+        yield '<section>', 0
+        yield heading("h2", "Méthodologie")
+        yield themed_paragraph()
+        yield '<blockquote class="border-l-4 border-primary pl-4 italic my-6">Cette méthodologie repose sur une approche reproductible et rigoureuse des protocoles scientifiques.</blockquote>', 14
+        yield '</section>', 0
+
+        yield '<section>', 0
+        yield heading("h2", "Résultats")
+        yield themed_paragraph()
+        yield TABLE_HTML, 0
+        yield '</section>', 0
+
+        # Corps principal : sections longues jusqu'à la cible de mots
+        part = 0
+        while words[0] < target_words:
+            title = EXTRA_SECTIONS[part % len(EXTRA_SECTIONS)]
+            if part >= len(EXTRA_SECTIONS):
+                title = f"{title} ({part // len(EXTRA_SECTIONS) + 1})"
+            yield '<section>', 0
+            yield heading("h3", title)
+            for _ in range(rng.randint(3, 6)):
+                yield themed_paragraph(None, rng.randint(8, 14))
+                if words[0] >= target_words:
+                    break
+            yield '</section>', 0
+            part += 1
+
+        yield '<section>', 0
+        yield heading("h2", "Discussion")
+        yield themed_paragraph()
+        items = text.sentences(4)
+        yield (
+            '<ul class="list-disc pl-6 mb-6 space-y-2">' +
+            "".join(f'<li class="text-muted-foreground">{item}</li>' for item in items) +
+            '</ul>',
+            sum(item.count(" ") + 1 for item in items)
+        )
+        yield '</section>', 0
+
+        yield '<section>', 0
+        yield heading("h2", "Conclusion")
+        yield themed_paragraph("muted", 6)
+        yield '</section>', 0
+
+        # Bibliographie proportionnelle à la longueur de l'article
+        yield '<section>', 0
+        yield heading("h2", "Références")
+        yield '<ol class="list-decimal pl-6 space-y-3">', 0
+        for _ in range(10 + words[0] // 2000):
+            citation = generate_citation()
+            yield f'<li class="text-muted-foreground">{citation}</li>', citation.count(" ") + 1
+        yield '</ol>', 0
+        yield '</section>', 0
+
+        yield '</article>', 0
+
+    # Le compteur est mis à jour avant que fragments() ne reprenne la main
+    for fragment, count in fragments():
+        words[0] += count
+        yield fragment, count
+
+def generate_html_content(min_words: int, max_words: int) -> Tuple[str, int]:
+    """Génère un contenu HTML structuré riche en balises et styles typographiques
+
+    Retourne le HTML et son nombre de mots, compté pendant la génération.
+    """
+    target = rng.randint(min_words, max_words)
+    fragments = []
+    words = 0
+    for fragment, count in iter_html_content(target):
+        fragments.append(fragment)
+        words += count
+    return "\n".join(fragments), words
+
+def read_time(words: int) -> str:
+    """Temps de lecture affiché, à raison de WORDS_PER_MINUTE mots par minute"""
+    return f"{max(1, round(words / WORDS_PER_MINUTE))} min"
+
+def generate_article_payload(min_words: int, max_words: int, bursts: Optional[PublishingBursts] = None) -> Dict:
+    """Génère les champs textuels et statistiques d'un article
+
+    Vues et citations suivent des lois de puissance ; avec bursts, les dates
+    de publication se concentrent autour de pics d'activité.
+    """
+    content, words = generate_html_content(min_words, max_words)
+    return {
+        "title": text.sentence(nb_words=8).replace('.', ''),
+        "description": text.paragraph(nb_sentences=2),
+        "content": content,
+        # Même valeur que md5(content) dans PostgreSQL : render_artifacts s'en sert
+        # pour repérer les articles à retraiter sans relire leur contenu
+        "contentHash": hashlib.md5(content.encode("utf-8")).hexdigest(),
+        "publishedAt": bursts.sample(rng, datetime.now()) if bursts else datetime.now() - timedelta(days=rng.uniform(0, 3 * 365)),
+        "readTime": read_time(words),
+        "views": article_views(rng),
+        "featured": rng.choice([True, False]),
+        "citations": article_citations(rng)
+    }
+
+def generate_article_chunk(seed: int, count: int, min_words: int, max_words: int, dataset_seed: Optional[int] = None) -> List[Dict]:
+    """Point d'entrée des processus de génération : un lot d'articles par graine
+
+    La graine est propre au lot, le résultat ne dépend donc pas du processus
+    qui l'exécute ni de l'ordre dans lequel les lots sont traités. Les pics
+    de publication dépendent de dataset_seed, commun à tous les lots.
+    """
+    rng.seed(seed)
+    text.seed(seed)
+    bursts = publishing_bursts(dataset_seed) if dataset_seed is not None else None
+    return [generate_article_payload(min_words, max_words, bursts) for _ in range(count)]
+
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from seed_metrics import metrics
+from seed_writer import FLUSH_ORDER, PARENT_KEYS, SEEDED_TABLES
+
+try:
+    import asyncpg
+except ImportError:  # requis seulement pour le chargement par COPY
+    asyncpg = None
+
+LINKS = "_ArticleToTag"
+
+# Modèle Prisma -> (table, colonnes) dans l'ordre attendu par COPY
+TABLES: Dict[str, Tuple[str, List[str]]] = {
+    "category": ("Category", ["id", "name", "slug"]),
+    "tag": ("Tag", ["id", "name"]),
+    "author": ("Author", [
+        "id", "name", "slug", "title", "affiliation", "bio", "expertise", "email",
+        "twitter", "linkedin", "orcid", "researchgate", "articlesCount", "citations",
+        "hIndex", "avatar"
+    ]),
+    "education": ("Education", ["id", "degree", "institution", "year", "authorId"]),
+    "article": ("Article", [
+        "id", "title", "slug", "description", "content", "contentHash", "publishedAt",
+        "readTime", "featured", "views", "citations", "authorId", "categoryId"
+    ]),
+    "component": ("Component", ["id", "type", "data", "articleId"]),
+}
+
+JSON_COLUMNS = {("component", "data")}
+
+
+def asyncpg_dsn(url: str) -> str:
+    """Retire de DATABASE_URL les paramètres propres à Prisma, inconnus d'asyncpg"""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k == "sslmode"]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def prisma_schema(url: str) -> str:
+    """Schéma visé par le paramètre ?schema= de DATABASE_URL ("public" par défaut, comme Prisma)"""
+    return dict(parse_qsl(urlsplit(url).query)).get("schema", "public")
+
+
+async def connect(url: str):
+    """Connexion asyncpg à DATABASE_URL, avec le search_path sur le schéma de Prisma
+
+    Sans cela, les requêtes non qualifiées et current_schema() viseraient
+    "public" même quand Prisma travaille dans un autre schéma.
+    """
+    schema = prisma_schema(url).replace('"', '""')
+    return await asyncpg.connect(asyncpg_dsn(url), server_settings={"search_path": f'"{schema}"'})
+
+
+class CopySink:
+    """Charge les lignes générées avec COPY FROM STDIN (binaire), sans passer par l'ORM
+
+    Même interface que BatchWriter. Les index secondaires non uniques des
+    tables du seed sont supprimés à l'ouverture et reconstruits à la
+    fermeture, suivis d'un ANALYZE. Un lot rejeté est coupé en deux et
+    réessayé jusqu'à isoler les lignes fautives.
+    """
+
+    def __init__(self, batch_size: int = 5000, dsn: Optional[str] = None):
+        if asyncpg is None:
+            raise RuntimeError("Le chargement par COPY nécessite asyncpg (pip install asyncpg)")
+        self.batch_size = batch_size
+        self.dsn = dsn or os.environ["DATABASE_URL"]
+        self.conn = None
+        self.pending: Dict[str, List[Tuple]] = defaultdict(list)
+        self.pending_rows: Dict[str, List[Dict]] = defaultdict(list)
+        self.links: List[Tuple[str, str]] = []
+        self.written: Counter = Counter()
+        self.failed: Counter = Counter()
+        self.failed_ids: set = set()
+        self.retries = 0
+        self.dropped_indexes: List[Tuple[str, str]] = []
+        self._callbacks: Dict[str, List[Callable[[List[Dict]], None]]] = defaultdict(list)
+        # Une seule connexion : deux COPY simultanés y sont refusés par asyncpg
+        self._lock = asyncio.Lock()
+
+    def on_written(self, model: str, callback: Callable[[List[Dict]], None]):
+        self._callbacks[model].append(callback)
+
+    async def open(self):
+        self.conn = await connect(self.dsn)
+        await self._drop_indexes()
+
+    async def close(self):
+        """Écrit le reste, reconstruit les index et met à jour les statistiques"""
+        try:
+            await self.flush()
+        finally:
+            await self._restore_indexes()
+            start = time.perf_counter()
+            await self.conn.execute("ANALYZE " + ", ".join(f'"{t}"' for t in SEEDED_TABLES))
+            print(f"ANALYZE en {time.perf_counter() - start:.2f}s")
+            await self.conn.close()
+
+    async def _drop_indexes(self):
+        rows = await self.conn.fetch(
+            """
+            SELECT ci.relname AS name, pg_get_indexdef(i.indexrelid) AS definition
+            FROM pg_index i
+            JOIN pg_class ci ON ci.oid = i.indexrelid
+            JOIN pg_class ct ON ct.oid = i.indrelid
+            JOIN pg_namespace n ON n.oid = ct.relnamespace
+            WHERE n.nspname = current_schema()
+              AND ct.relname = ANY($1::text[])
+              AND NOT i.indisprimary AND NOT i.indisunique
+            """,
+            SEEDED_TABLES
+        )
+        self.dropped_indexes = [(row["name"], row["definition"]) for row in rows]
+        for name, definition in self.dropped_indexes:
+            # Affiché pour pouvoir le recréer à la main si le chargement est interrompu
+            print(f"Index suspendu pendant le chargement : {definition}")
+            await self.conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+    async def _restore_indexes(self):
+        start = time.perf_counter()
+        for _, definition in self.dropped_indexes:
+            await self.conn.execute(definition)
+        if self.dropped_indexes:
+            print(f"{len(self.dropped_indexes)} index reconstruits en {time.perf_counter() - start:.2f}s")
+        self.dropped_indexes = []
+
+    def _record(self, model: str, row: Dict) -> Tuple:
+        columns = TABLES[model][1]
+        return tuple(
+            json.dumps(row.get(column)) if (model, column) in JSON_COLUMNS else row.get(column)
+            for column in columns
+        )
+
+    async def add(self, model: str, row: Dict):
+        self.pending[model].append(self._record(model, row))
+        self.pending_rows[model].append(row)
+        if len(self.pending[model]) >= self.batch_size:
+            await self.flush()
+
+    async def add_tags(self, article_id: str, tag_ids: List[str]):
+        self.links.extend((article_id, tag_id) for tag_id in tag_ids)
+        if len(self.links) >= self.batch_size * 3:
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            # Instantané de tous les modèles, comme BatchWriter.flush
+            pending, self.pending = self.pending, defaultdict(list)
+            pending_rows, self.pending_rows = self.pending_rows, defaultdict(list)
+            links, self.links = self.links, []
+            for model in FLUSH_ORDER:
+                records = pending.get(model)
+                if records:
+                    await self._write(model, records, pending_rows[model])
+            links = [link for link in links if link[0] not in self.failed_ids]
+            if links:
+                await self._copy(LINKS, links, None)
+
+    async def _write(self, model: str, records: List[Tuple], rows: List[Dict]):
+        # Comme BatchWriter : les enfants d'un parent non écrit violeraient la clé étrangère
+        parent_key = PARENT_KEYS.get(model)
+        if parent_key and self.failed_ids:
+            kept = [i for i, row in enumerate(rows) if row[parent_key] not in self.failed_ids]
+            if len(kept) < len(rows):
+                orphans = [row for row in rows if row[parent_key] in self.failed_ids]
+                self.failed[model] += len(orphans)
+                self.failed_ids.update(row["id"] for row in orphans)
+                records = [records[i] for i in kept]
+                rows = [rows[i] for i in kept]
+        if records:
+            await self._copy(model, records, rows)
+
+    async def _copy(self, model: str, records: List[Tuple], rows: Optional[List[Dict]]):
+        table, columns = TABLES[model] if model in TABLES else (LINKS, ["A", "B"])
+        try:
+            async with metrics.query(model, "copy"):
+                await self.conn.copy_records_to_table(table, records=records, columns=columns)
+        except Exception as e:
+            if len(records) == 1:
+                print(f"Erreur COPY {table}: {e}")
+                self.failed[model] += 1
+                if rows:
+                    self.failed_ids.add(rows[0]["id"])
+                return
+            # Un COPY rejeté n'écrit rien : chaque moitié est réessayée pour isoler les lignes fautives
+            self.retries += 1
+            middle = len(records) // 2
+            await self._copy(model, records[:middle], rows[:middle] if rows else None)
+            await self._copy(model, records[middle:], rows[middle:] if rows else None)
+            return
+        self.written[model] += len(records)
+        metrics.add_rows(model, len(records))
+        for callback in self._callbacks[model]:
+            callback(rows)
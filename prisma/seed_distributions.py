@@ -0,0 +1,167 @@
+import random
+from array import array
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Iterator, List, Sequence, Tuple
+
+
+class AliasTable:
+    """Tirage pondéré en O(1) par la méthode des alias de Vose
+
+    La table est construite une fois en O(n) ; chaque tirage ne consomme
+    ensuite qu'un seul rng.random(), quelle que soit la taille de la table.
+    """
+
+    __slots__ = ("size", "prob", "alias")
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        if n == 0:
+            raise ValueError("AliasTable nécessite au moins un poids")
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        self.size = n
+        self.prob = array("d", [1.0] * n)
+        self.alias = array("I", range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Les restes valent 1 aux erreurs d'arrondi près
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def sample(self, rng: random.Random) -> int:
+        u = rng.random() * self.size
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+    def sample_many(self, rng: random.Random, count: int) -> List[int]:
+        """count tirages d'un coup, sans appel de méthode ni accès d'attribut par tirage"""
+        size, prob, alias = self.size, self.prob, self.alias
+        draws = []
+        for u in [rng.random() * size for _ in range(count)]:
+            i = int(u)
+            draws.append(i if u - i < prob[i] else alias[i])
+        return draws
+
+
+def zipf_weights(n: int, exponent: float) -> List[float]:
+    """Poids de Zipf 1 / rang^exponent pour les rangs 1..n"""
+    return [1.0 / (rank ** exponent) for rank in range(1, n + 1)]
+
+
+def zipf_table(n: int, exponent: float, rng: random.Random) -> AliasTable:
+    """Table de Zipf dont les rangs sont répartis au hasard sur les n indices
+
+    Sans cette permutation, les éléments populaires seraient toujours les
+    premiers créés.
+    """
+    ranks = list(range(n))
+    rng.shuffle(ranks)
+    weights = zipf_weights(n, exponent)
+    return AliasTable([weights[rank] for rank in ranks])
+
+
+def power_law(rng: random.Random, minimum: float, alpha: float, cap: float) -> int:
+    """Tirage de Pareto (densité en x^-alpha) à partir de minimum, plafonné à cap"""
+    value = minimum * (1.0 - rng.random()) ** (-1.0 / (alpha - 1.0))
+    return int(min(value, cap))
+
+
+class TagClusters:
+    """Tags regroupés en thèmes qui apparaissent ensemble dans les articles
+
+    Un article tire un thème (popularité de Zipf), puis ses tags dans ce
+    thème ; avec une probabilité cross, un tag est pris hors du thème.
+    """
+
+    def __init__(self, count: int, rng: random.Random, cluster_size: int = 4, exponent: float = 1.1, cross: float = 0.15):
+        indices = list(range(count))
+        rng.shuffle(indices)
+        self.count = count
+        self.cross = cross
+        self.clusters = [indices[i:i + cluster_size] for i in range(0, count, cluster_size)]
+        self.cluster_table = AliasTable(zipf_weights(len(self.clusters), exponent))
+        self.global_table = zipf_table(count, exponent, rng)
+
+    def sample(self, rng: random.Random, k: int) -> List[int]:
+        """k indices de tags distincts (au plus count)"""
+        k = min(k, self.count)
+        cluster = self.clusters[self.cluster_table.sample(rng)]
+        chosen = rng.sample(cluster, min(k, len(cluster)))
+        if len(chosen) == k and k > 1 and rng.random() < self.cross:
+            chosen.pop()
+        while len(chosen) < k:
+            index = self.global_table.sample(rng)
+            if index not in chosen:
+                chosen.append(index)
+        return chosen
+
+
+class PublishingBursts:
+    """Dates de publication concentrées autour de quelques pics d'activité
+
+    Une part background des dates est uniforme sur la fenêtre, le reste suit
+    des gaussiennes centrées sur des pics (conférences, appels à projets).
+    """
+
+    def __init__(self, seed: int, days: int = 3 * 365, bursts: int = 12,
+                 width_days: float = 6.0, background: float = 0.3):
+        rng = random.Random(seed)
+        self.days = days
+        self.background = background
+        self.width = width_days
+        self.centers = [rng.uniform(0, days) for _ in range(bursts)]
+        self.table = AliasTable([rng.paretovariate(1.5) for _ in range(bursts)])
+
+    def sample(self, rng: random.Random, now: datetime) -> datetime:
+        if rng.random() < self.background:
+            offset = rng.uniform(0, self.days)
+        else:
+            offset = rng.gauss(self.centers[self.table.sample(rng)], self.width)
+            offset = min(max(offset, 0.0), float(self.days))
+        return now - timedelta(days=offset)
+
+
+@lru_cache(maxsize=4)
+def publishing_bursts(seed: int) -> PublishingBursts:
+    """Pics partagés par tous les lots d'un même jeu de données (un par processus)"""
+    return PublishingBursts(seed)
+
+
+class Distributions:
+    """Tirage des relations d'un article : auteur, catégorie et tags
+
+    Construit une fois pour tout le run, à partir du nombre d'auteurs, de
+    catégories et de tags ; tous les tirages passent par rng.
+    """
+
+    def __init__(self, rng: random.Random, authors: int, categories: int, tags: int,
+                 author_exponent: float = 1.0, category_exponent: float = 0.8):
+        self.rng = rng
+        self.authors = zipf_table(authors, author_exponent, rng)
+        self.categories = zipf_table(categories, category_exponent, rng)
+        self.tags = TagClusters(tags, rng)
+
+    def draw(self, count: int, k: int = 3) -> Iterator[Tuple[int, int, List[int]]]:
+        """(auteur, catégorie, k tags) pour count articles, tirés par blocs"""
+        authors = self.authors.sample_many(self.rng, count)
+        categories = self.categories.sample_many(self.rng, count)
+        tag_sets = [self.tags.sample(self.rng, k) for _ in range(count)]
+        return zip(authors, categories, tag_sets)
+
+
+def article_views(rng: random.Random) -> int:
+    """Vues : queue lourde, quelques articles concentrent l'essentiel du trafic"""
+    return power_law(rng, 100, 2.2, 1_000_000)
+
+
+def article_citations(rng: random.Random) -> int:
+    """Citations : la plupart des articles n'en ont aucune ou presque"""
+    return power_law(rng, 1, 2.1, 20_000) - 1
+
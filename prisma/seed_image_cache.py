@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = os.environ.get("SEED_IMAGE_CACHE", ".cache/seed-images")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def cache_key(style: str, seed: str, version: str) -> str:
+    """Clé de cache d'une image générée de façon déterministe"""
+    return hashlib.sha256(f"{version}/{style}/{seed}".encode("utf-8")).hexdigest()
+
+
+class ImageCache:
+    """Cache disque persistant des images DiceBear, adressé par contenu
+
+    Les images sont stockées une seule fois sous objects/<sha256> et un index
+    JSON associe chaque clé (style, graine, version d'API) à son contenu.
+    L'éviction se fait par taille, les entrées les moins récemment utilisées
+    en premier, et chaque lecture vérifie l'empreinte du fichier.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root, "index.json")
+        # Ordre LRU : la tête est la moins récemment utilisée
+        self.index: "OrderedDict[str, Dict]" = OrderedDict()
+        self._refs: Counter = Counter()
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self.load()
+
+    def load(self):
+        """Charge l'index, en repartant de zéro s'il est illisible"""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        # Un seul tri au chargement ; ensuite l'ordre est tenu à chaque accès
+        self.index = OrderedDict(sorted(entries.items(), key=lambda item: item[1]["last_used"]))
+        self._refs = Counter(e["sha256"] for e in self.index.values())
+        sizes = {e["sha256"]: e["size"] for e in self.index.values()}
+        self._total = sum(sizes.values())
+
+    def save(self):
+        """Écrit l'index de manière atomique"""
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest)
+
+    def _drop(self, key: str):
+        entry = self.index.pop(key, None)
+        if entry is None:
+            return
+        # Le contenu peut être partagé par plusieurs clés
+        digest = entry["sha256"]
+        self._refs[digest] -= 1
+        if self._refs[digest] <= 0:
+            del self._refs[digest]
+            self._total -= entry["size"]
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                pass
+
+    def get_path(self, style: str, seed: str, version: str) -> Optional[str]:
+        """Retourne le chemin vérifié de l'image en cache, ou None"""
+        key = cache_key(style, seed, version)
+        entry = self.index.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        path = self._object_path(entry["sha256"])
+        try:
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            digest = None
+        if digest != entry["sha256"]:
+            print(f"Cache image corrompu pour {style}/{seed}, entrée supprimée")
+            self._drop(key)
+            self.misses += 1
+            return None
+        entry["last_used"] = time.time()
+        self.index.move_to_end(key)
+        self.hits += 1
+        return path
+
+    def put(self, style: str, seed: str, version: str, data: bytes) -> str:
+        """Ajoute une image au cache et retourne le chemin de son contenu"""
+        key = cache_key(style, seed, version)
+        self._drop(key)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        if self._refs[digest] == 0:
+            self._total += len(data)
+        self._refs[digest] += 1
+        self.index[key] = {
+            "sha256": digest,
+            "size": len(data),
+            "last_used": time.time()
+        }
+        if self._total > self.max_bytes:
+            self.evict(keep=key)
+        return path
+
+    def evict(self, keep: Optional[str] = None):
+        """Supprime les entrées les moins récentes tant que le cache dépasse sa taille
+
+        Les entrées sont parcourues depuis la tête de l'index, sans tri.
+        """
+        while self._total > self.max_bytes and self.index:
+            key = next(iter(self.index))
+            # keep vient d'être ajoutée en queue : en tête, elle est seule
+            if key == keep:
+                break
+            self._drop(key)
+
+    def materialize(self, source: str, dest: str):
+        """Place une image du cache dans public/ par lien physique, ou par copie"""
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        # Ne jamais écrire à travers un lien existant, cela modifierait le cache
+        if os.path.lexists(dest):
+            os.remove(dest)
+        try:
+            os.link(source, dest)
+        except OSError:
+            shutil.copyfile(source, dest)
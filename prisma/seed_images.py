@@ -0,0 +1,236 @@
+import asyncio
+import hashlib
+import os
+import random
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import aiofiles
+import aiohttp
+
+from seed_image_cache import ImageCache
+from seed_metrics import metrics
+
+DICEBEAR_VERSION = "9.x"
+AVATAR_STYLE = "initials"
+BANNER_STYLE = "glass"
+
+# Statuts pour lesquels une nouvelle tentative a du sens
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def dicebear_url(style: str, seed: str) -> str:
+    """Construit l'URL DiceBear d'une image SVG"""
+    return f"https://api.dicebear.com/{DICEBEAR_VERSION}/{style}/svg?seed={seed}"
+
+
+class ImageProvider(ABC):
+    """Interface commune des fournisseurs d'avatars et de bannières"""
+
+    async def __aenter__(self) -> "ImageProvider":
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    @abstractmethod
+    async def download_author_images(self, slug: str, avatars_dir: str, banners_dir: str) -> Dict[str, bool]:
+        """Produit l'avatar et la bannière d'un auteur dans les dossiers donnés"""
+
+
+class ImageFetcher(ImageProvider):
+    """Client HTTP partagé par les scripts de seed pour télécharger les images
+
+    Une seule session et un seul pool de connexions (keep-alive) sont utilisés
+    pour tout le run, avec un plafond global de requêtes simultanées et des
+    nouvelles tentatives avec backoff exponentiel sur les 429/5xx.
+    Avec un cache, les images déjà connues ne sont jamais retéléchargées.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        limit_per_host: int = 16,
+        timeout: float = 15.0,
+        retries: int = 4,
+        backoff: float = 0.5,
+        cache: Optional[ImageCache] = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Générateur séparé pour ne pas perturber la graine des données
+        self._jitter = random.Random()
+
+    async def __aenter__(self) -> "ImageFetcher":
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=30,
+            ttl_dns_cache=300
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.session:
+            await self.session.close()
+            self.session = None
+        if self.cache:
+            self.cache.save()
+
+    def _delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * (2 ** attempt) * (1 + self._jitter.random())
+
+    async def fetch(self, url: str) -> Optional[bytes]:
+        """Récupère le contenu d'une URL, ou None après épuisement des tentatives"""
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                async with self._semaphore, metrics.query("dicebear", "get"):
+                    async with self.session.get(url) as response:
+                        if response.status == 200:
+                            data = await response.read()
+                            metrics.add_bytes(len(data))
+                            return data
+                        if response.status not in RETRY_STATUSES:
+                            print(f"Erreur téléchargement {url}: HTTP {response.status}")
+                            return None
+                        retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    print(f"Erreur téléchargement {url}: {e!r}")
+            if attempt < self.retries:
+                await asyncio.sleep(self._delay(attempt, retry_after))
+        return None
+
+    async def download(self, url: str, path: str) -> bool:
+        """Télécharge une image dans un fichier"""
+        data = await self.fetch(url)
+        if data is None:
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.lexists(path):
+            os.remove(path)
+        async with aiofiles.open(path, "wb") as f:
+            await f.write(data)
+        return True
+
+    async def download_dicebear(self, style: str, seed: str, path: str) -> bool:
+        """Place une image DiceBear dans path, depuis le cache si possible"""
+        if self.cache is None:
+            return await self.download(dicebear_url(style, seed), path)
+        cached = self.cache.get_path(style, seed, DICEBEAR_VERSION)
+        if cached is None:
+            data = await self.fetch(dicebear_url(style, seed))
+            if data is None:
+                return False
+            cached = self.cache.put(style, seed, DICEBEAR_VERSION, data)
+        self.cache.materialize(cached, path)
+        return True
+
+    async def download_author_images(self, slug: str, avatars_dir: str, banners_dir: str) -> Dict[str, bool]:
+        """Télécharge en parallèle l'avatar et la bannière d'un auteur"""
+        avatar, banner = await asyncio.gather(
+            self.download_dicebear(AVATAR_STYLE, slug, f"{avatars_dir}/{slug}.svg"),
+            self.download_dicebear(BANNER_STYLE, slug, f"{banners_dir}/{slug}.svg")
+        )
+        return {"avatar": avatar, "banner": banner}
+
+
+def _palette(slug: str) -> List[int]:
+    """Teintes déterministes dérivées du slug"""
+    digest = hashlib.sha256(slug.encode("utf-8")).digest()
+    return list(digest)
+
+
+def _initials(slug: str) -> str:
+    parts = [part for part in slug.split("-") if part]
+    return "".join(part[0] for part in parts[:2]).upper() or "?"
+
+
+def render_initials_avatar(slug: str) -> str:
+    """Avatar SVG à initiales, dans l'esprit du style DiceBear initials"""
+    b = _palette(slug)
+    hue = b[0] * 360 // 256
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100" width="100" height="100">'
+        f'<rect width="100" height="100" fill="hsl({hue}, 55%, 45%)"/>'
+        '<text x="50" y="50" font-family="Arial, sans-serif" font-size="42" font-weight="600" '
+        f'fill="#ffffff" text-anchor="middle" dy=".35em">{_initials(slug)}</text>'
+        '</svg>'
+    )
+
+
+def render_glass_banner(slug: str) -> str:
+    """Bannière SVG en dégradé avec formes translucides, dans l'esprit du style glass"""
+    b = _palette(slug)
+    hue_a = b[1] * 360 // 256
+    hue_b = (hue_a + 40 + b[2] % 80) % 360
+    shapes = "".join(
+        f'<circle cx="{b[3 + i * 3] * 100 // 255}" cy="{b[4 + i * 3] * 100 // 255}" '
+        f'r="{20 + b[5 + i * 3] % 40}" fill="#ffffff" fill-opacity="0.{15 + i * 5}"/>'
+        for i in range(4)
+    )
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100" width="100" height="100">'
+        f'<defs><linearGradient id="g" x1="0" y1="0" x2="1" y2="1">'
+        f'<stop offset="0" stop-color="hsl({hue_a}, 70%, 55%)"/>'
+        f'<stop offset="1" stop-color="hsl({hue_b}, 70%, 40%)"/>'
+        '</linearGradient></defs>'
+        f'<rect width="100" height="100" fill="url(#g)"/>{shapes}'
+        '</svg>'
+    )
+
+
+class LocalSvgProvider(ImageProvider):
+    """Génère les images localement, sans réseau, et les écrit par lots"""
+
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = batch_size
+        self.pending: List[Tuple[str, str]] = []
+
+    async def __aexit__(self, *exc):
+        await self.flush()
+
+    @staticmethod
+    def _write_batch(batch: List[Tuple[str, str]]):
+        for path, svg in batch:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Ne pas écrire à travers un lien physique vers le cache d'images
+            if os.path.lexists(path):
+                os.remove(path)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(svg)
+
+    async def flush(self):
+        """Écrit les fichiers en attente dans un thread"""
+        batch, self.pending = self.pending, []
+        if batch:
+            await asyncio.to_thread(self._write_batch, batch)
+
+    async def download_author_images(self, slug: str, avatars_dir: str, banners_dir: str) -> Dict[str, bool]:
+        self.pending.append((f"{avatars_dir}/{slug}.svg", render_initials_avatar(slug)))
+        self.pending.append((f"{banners_dir}/{slug}.svg", render_glass_banner(slug)))
+        if len(self.pending) >= self.batch_size:
+            await self.flush()
+        return {"avatar": True, "banner": True}
+
+
+def make_image_provider(name: str, max_concurrency: int = 32, cache: Optional[ImageCache] = None) -> ImageProvider:
+    """Instancie le fournisseur d'images demandé ("dicebear" ou "local")"""
+    if name == "local":
+        return LocalSvgProvider()
+    if name == "dicebear":
+        return ImageFetcher(max_concurrency=max_concurrency, cache=cache)
+    raise ValueError(f"Fournisseur d'images inconnu: {name}")
@@ -0,0 +1,102 @@
+import json
+from typing import Any, Iterator, TextIO
+
+try:
+    import ijson
+except ImportError:  # optionnel : le lecteur de secours suffit, en plus lent
+    ijson = None
+
+CHUNK_SIZE = 1 << 20
+
+
+class _Reader:
+    """Tampon glissant sur un fichier texte pour json.JSONDecoder.raw_decode
+
+    Seul le texte pas encore décodé est conservé : la mémoire dépend de la
+    taille d'un élément, pas de celle du fichier.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.file.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Premier caractère significatif, sans le consommer ('' en fin de fichier)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON invalide : '{char}' attendu, '{found}' trouvé")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Décode la valeur suivante, en relisant du fichier tant qu'elle est incomplète"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Un nombre en fin de tampon peut être tronqué
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_array_fallback(file: TextIO, key: str) -> Iterator[Any]:
+    reader = _Reader(file)
+    reader.expect("{")
+    while reader.peek() != "}":
+        name = reader.value()
+        reader.expect(":")
+        if name != key:
+            reader.value()
+        else:
+            reader.expect("[")
+            while reader.peek() != "]":
+                yield reader.value()
+                if reader.peek() == ",":
+                    reader.pos += 1
+            reader.pos += 1
+        if reader.peek() == ",":
+            reader.pos += 1
+
+
+def iter_json_array(path: str, key: str) -> Iterator[Any]:
+    """Produit un à un les éléments du tableau path[key] sans charger tout le fichier
+
+    Le fichier doit être un objet JSON, par exemple {"articles": [...]}.
+    Utilise ijson s'il est installé, sinon un lecteur par raw_decode.
+    """
+    if ijson is not None:
+        with open(path, "rb") as f:
+            # use_float : pas de Decimal, mêmes types que json.load
+            yield from ijson.items(f, f"{key}.item", use_float=True)
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        yield from _iter_array_fallback(f, key)
@@ -0,0 +1,152 @@
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_REPORT_PATH = os.environ.get("SEED_REPORT", ".cache/seed-report.json")
+
+# Bornes supérieures des classes de l'histogramme de latence, en millisecondes
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf")]
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """Pic de mémoire résidente du processus et de ses enfants (pool de génération)"""
+    if resource is None:
+        return {}
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1)
+    }
+
+
+class OperationStats:
+    """Nombre, durée cumulée et histogramme de latence d'une opération"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        ms = seconds * 1000
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                break
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 4),
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0,
+            "max_ms": round(self.max * 1000, 2),
+            "histogram_ms": {
+                ("inf" if bound == float("inf") else str(bound)): n
+                for bound, n in zip(LATENCY_BUCKETS_MS, self.buckets) if n
+            }
+        }
+
+
+class Metrics:
+    """Instrumentation d'un run de seed : phases, requêtes, octets, lignes et mémoire"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, Dict] = {}
+        self.operations: Dict[str, OperationStats] = defaultdict(OperationStats)
+        self.rows: Counter = Counter()
+        self.bytes_downloaded = 0
+
+    @contextmanager
+    def phase(self, name: str):
+        """Mesure la durée d'une phase et les lignes écrites pendant celle-ci"""
+        rows_before = sum(self.rows.values())
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = self.phases.setdefault(name, {"seconds": 0.0, "rows": 0})
+            entry["seconds"] += elapsed
+            entry["rows"] += sum(self.rows.values()) - rows_before
+
+    @asynccontextmanager
+    async def query(self, model: str, operation: str):
+        """Chronomètre une requête (base ou HTTP) sous la clé modèle.opération"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.operations[f"{model}.{operation}"].record(time.perf_counter() - start)
+
+    def add_rows(self, model: str, count: int):
+        self.rows[model] += count
+
+    def add_bytes(self, count: int):
+        self.bytes_downloaded += count
+
+    def report(self) -> Dict:
+        """Rapport complet, sérialisable en JSON"""
+        total = time.perf_counter() - self.started
+        return {
+            "total_s": round(total, 3),
+            "phases": {
+                name: {
+                    "seconds": round(p["seconds"], 3),
+                    "rows": p["rows"],
+                    "rows_per_s": round(p["rows"] / p["seconds"], 1) if p["seconds"] > 0 else 0
+                }
+                for name, p in self.phases.items()
+            },
+            "operations": {key: stats.to_dict() for key, stats in sorted(self.operations.items())},
+            "rows": dict(self.rows),
+            "rows_per_s": round(sum(self.rows.values()) / total, 1) if total > 0 else 0,
+            "bytes_downloaded": self.bytes_downloaded,
+            "peak_rss_mb": peak_rss_mb()
+        }
+
+    def summary(self, report: Dict) -> str:
+        """Résumé lisible du rapport"""
+        lines: List[str] = [f"Durée totale : {report['total_s']:.2f}s"]
+        for name, p in report["phases"].items():
+            lines.append(f"  {name:<12} {p['seconds']:>9.3f}s  {p['rows']:>9} lignes  {p['rows_per_s']:>10.1f} lignes/s")
+        lines.append("Requêtes :")
+        for key, op in report["operations"].items():
+            lines.append(f"  {key:<28} {op['count']:>7} x  moy. {op['mean_ms']:>8.2f}ms  max {op['max_ms']:>9.2f}ms")
+        lines.append(f"Lignes écrites : {sum(report['rows'].values())} ({report['rows_per_s']:.1f}/s)")
+        lines.append(f"Téléchargé : {report['bytes_downloaded'] / 1024:.1f} Ko")
+        if report["peak_rss_mb"]:
+            rss = report["peak_rss_mb"]
+            lines.append(f"Pic mémoire : {rss['self']} Mo (processus), {rss['children']} Mo (workers)")
+        return "\n".join(lines)
+
+    def write(self, path: str = DEFAULT_REPORT_PATH) -> Dict:
+        """Affiche le résumé et écrit le rapport JSON dans path"""
+        report = self.report()
+        print(self.summary(report))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Rapport JSON : {path}")
+        return report
+
+
+# Instance partagée par les modules du seed
+metrics = Metrics()
@@ -0,0 +1,73 @@
+import os
+from typing import Dict, Optional
+
+DEFAULT_PROFILE = os.environ.get("SEED_PROFILE", "dev")
+
+# Volumes et tailles de lots par profil ; les articles raccourcissent quand
+# le volume augmente pour que la génération reste dominée par l'écriture
+PROFILES: Dict[str, Dict] = {
+    "dev": {
+        "nb_authors": 25,
+        "nb_articles": 60,
+        "min_words": 12000,
+        "max_words": 35000,
+        "sink": "prisma",
+        "batch_size": 500,
+        "copy_batch_size": 5000,
+        "chunk_size": 16,
+    },
+    "staging": {
+        "nb_authors": 500,
+        "nb_articles": 10_000,
+        "min_words": 1500,
+        "max_words": 6000,
+        "sink": "prisma",
+        "batch_size": 1000,
+        "copy_batch_size": 5000,
+        "chunk_size": 32,
+    },
+    "perf": {
+        "nb_authors": 5_000,
+        "nb_articles": 250_000,
+        "min_words": 400,
+        "max_words": 1500,
+        "sink": "copy",
+        "batch_size": 1000,
+        "copy_batch_size": 10000,
+        "chunk_size": 64,
+    },
+    "xl": {
+        "nb_authors": 50_000,
+        "nb_articles": 2_000_000,
+        "min_words": 300,
+        "max_words": 1000,
+        "sink": "copy",
+        "batch_size": 2000,
+        "copy_batch_size": 20000,
+        "chunk_size": 128,
+    },
+}
+
+# Variables d'environnement prioritaires sur le profil
+ENV_OVERRIDES = {
+    "nb_authors": "SEED_NB_AUTHORS",
+    "nb_articles": "SEED_NB_ARTICLES",
+    "min_words": "SEED_MIN_WORDS",
+    "max_words": "SEED_MAX_WORDS",
+}
+
+
+def env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def profile_config(name: str) -> Dict:
+    """Réglages du profil name, surchargés par les variables SEED_* définies"""
+    if name not in PROFILES:
+        raise ValueError(f"Profil inconnu : {name} (profils : {', '.join(PROFILES)})")
+    config = dict(PROFILES[name])
+    for key, variable in ENV_OVERRIDES.items():
+        config[key] = env_int(variable, config[key])
+    config["sink"] = os.environ.get("SEED_SINK") or config["sink"]
+    return config
@@ -0,0 +1,131 @@
+import hashlib
+import unicodedata
+from array import array
+
+import slugify
+from prisma import Prisma
+
+from seed_metrics import metrics
+
+
+def clean_string(text: str) -> str:
+    """Normalise et supprime les accents"""
+    return unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII')
+
+def create_slug(name: str) -> str:
+    """Crée un slug sans accents"""
+    return slugify.slugify(clean_string(name))
+
+
+class _DigestTable:
+    """Table à adressage ouvert d'empreintes 64 bits, avec une valeur entière optionnelle
+
+    Les clés tiennent dans un array('Q') (8 octets par case, 0 marque une case
+    libre) et les valeurs dans un array('I') parallèle : la mémoire reste
+    proportionnelle au nombre d'entrées, sans objet Python par entrée.
+    """
+
+    MAX_LOAD = 0.7
+
+    def __init__(self, with_values: bool = False, capacity: int = 1024):
+        self.size = 0
+        self._with_values = with_values
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        self._mask = capacity - 1
+        self._limit = int(capacity * self.MAX_LOAD)
+        self.keys = array("Q", bytes(8 * capacity))
+        self.values = array("I", bytes(4 * capacity)) if self._with_values else None
+
+    def _slot(self, key: int) -> int:
+        # Les empreintes sont déjà uniformes : leurs bits de poids faible suffisent
+        keys, mask = self.keys, self._mask
+        i = key & mask
+        current = keys[i]
+        while current and current != key:
+            i = (i + 1) & mask
+            current = keys[i]
+        return i
+
+    def __contains__(self, key: int) -> bool:
+        return self.keys[self._slot(key)] == key
+
+    def get(self, key: int, default: int) -> int:
+        i = self._slot(key)
+        return self.values[i] if self.keys[i] == key else default
+
+    def put(self, key: int, value: int = 0) -> bool:
+        """Insère ou met à jour key ; retourne True si la clé était absente"""
+        i = self._slot(key)
+        added = self.keys[i] != key
+        if added:
+            if self.size >= self._limit:
+                self._grow()
+                i = self._slot(key)
+            self.keys[i] = key
+            self.size += 1
+        if self.values is not None:
+            self.values[i] = value
+        return added
+
+    def _grow(self):
+        keys, values = self.keys, self.values
+        self._allocate(2 * len(keys))
+        for i, key in enumerate(keys):
+            if key:
+                j = self._slot(key)
+                self.keys[j] = key
+                if values is not None:
+                    self.values[j] = values[i]
+
+
+class SlugRegistry:
+    """Slugs déjà attribués pour un modèle, afin de résoudre les collisions avant l'insertion
+
+    Un slug déjà pris reçoit un suffixe déterministe (-2, -3, ...) : aucun
+    aller-retour en base n'échoue sur la contrainte d'unicité et le nombre
+    de lignes créées correspond exactement à la cible.
+
+    Seule une empreinte de 64 bits de chaque slug est conservée, dans des
+    tables à cases de taille fixe : 12 à 23 octets par slug, et 17 à 34 de
+    plus par slug de base ayant déjà eu une collision. Une collision
+    d'empreintes ne coûte qu'un suffixe superflu.
+    """
+
+    def __init__(self):
+        self.taken = _DigestTable()
+        # Prochain suffixe à essayer, par empreinte du slug de base
+        self._next_suffix = _DigestTable(with_values=True)
+
+    @staticmethod
+    def _digest(slug: str) -> int:
+        # 0 marque une case libre dans _DigestTable
+        return int.from_bytes(hashlib.blake2b(slug.encode(), digest_size=8).digest(), "little") or 1
+
+    def __len__(self) -> int:
+        return self.taken.size
+
+    def __contains__(self, slug: str) -> bool:
+        return self._digest(slug) in self.taken
+
+    def claim(self, slug: str) -> str:
+        """Réserve slug, ou la première variante suffixée libre"""
+        digest = self._digest(slug)
+        if self.taken.put(digest):
+            return slug
+        suffix = self._next_suffix.get(digest, 2)
+        while f"{slug}-{suffix}" in self:
+            suffix += 1
+        self._next_suffix.put(digest, suffix + 1)
+        candidate = f"{slug}-{suffix}"
+        self.taken.put(self._digest(candidate))
+        return candidate
+
+    async def preload(self, db: Prisma, table: str) -> int:
+        """Charge les slugs déjà présents dans la table et retourne leur nombre"""
+        async with metrics.query(table.lower(), "preload_slugs"):
+            rows = await db.query_raw(f'SELECT slug FROM "{table}"')
+        for row in rows:
+            self.taken.put(self._digest(row["slug"]))
+        return len(rows)
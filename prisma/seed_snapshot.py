@@ -0,0 +1,83 @@
+import gzip
+import json
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Tuple
+
+SNAPSHOT_FORMAT = "blog-seed-snapshot"
+SNAPSHOT_VERSION = 1
+LINKS = "_ArticleToTag"
+
+# Champs à reconvertir en datetime à la lecture
+DATETIME_FIELDS = {"article": ("publishedAt",)}
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+
+class SnapshotWriter:
+    """Écrit le jeu de données généré dans un snapshot JSON Lines compressé
+
+    Expose la même interface que BatchWriter pour pouvoir le remplacer dans
+    le pipeline de génération ; chaque ligne est écrite dès qu'elle arrive,
+    la mémoire reste donc constante quelle que soit la taille du jeu.
+    """
+
+    def __init__(self, path: str, compresslevel: int = 6):
+        self.path = path
+        self.file = gzip.open(path, "wt", encoding="utf-8", compresslevel=compresslevel)
+        self.file.write(json.dumps({"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION}) + "\n")
+        self.written: Counter = Counter()
+        self.failed: Counter = Counter()
+        self.failed_ids: set = set()
+        self._callbacks: Dict[str, List[Callable[[List[Dict]], None]]] = defaultdict(list)
+
+    def on_written(self, model: str, callback: Callable[[List[Dict]], None]):
+        self._callbacks[model].append(callback)
+
+    async def add(self, model: str, row: Dict):
+        self.file.write(json.dumps({"m": model, "r": row}, ensure_ascii=False, default=_encode) + "\n")
+        self.written[model] += 1
+        for callback in self._callbacks[model]:
+            callback([row])
+
+    async def add_tags(self, article_id: str, tag_ids: List[str]):
+        for tag_id in tag_ids:
+            self.file.write(json.dumps({"m": LINKS, "r": [article_id, tag_id]}) + "\n")
+        self.written[LINKS] += len(tag_ids)
+
+    async def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def iter_snapshot(path: str) -> Iterator[Tuple[str, object]]:
+    """Lit un snapshot ligne à ligne et produit les couples (modèle, ligne)"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != SNAPSHOT_FORMAT or header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} n'est pas un snapshot v{SNAPSHOT_VERSION} valide")
+        for line in f:
+            record = json.loads(line)
+            model, row = record["m"], record["r"]
+            for field in DATETIME_FIELDS.get(model, ()):
+                row[field] = datetime.fromisoformat(row[field])
+            yield model, row
+
+
+async def import_snapshot(path: str, writer) -> Counter:
+    """Charge un snapshot dans un writer (BatchWriter ou autre) sans rien générer"""
+    read: Counter = Counter()
+    for model, row in iter_snapshot(path):
+        if model == LINKS:
+            await writer.add_tags(row[0], [row[1]])
+        else:
+            await writer.add(model, row)
+        read[model] += 1
+    await writer.flush()
+    return read
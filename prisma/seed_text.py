@@ -0,0 +1,120 @@
+import random
+from array import array
+from typing import List, Optional, Sequence
+
+from faker.providers.lorem.en_US import Provider as EnglishLoremProvider
+from faker.providers.lorem.fr_FR import Provider as LoremProvider
+from faker.providers.person.fr_FR import Provider as PersonProvider
+
+try:
+    import numpy as np
+except ImportError:  # numpy est optionnel, random suffit mais tire moins vite
+    np = None
+
+JOURNALS = (
+    "Nature Climate Change",
+    "Science Advances",
+    "Environmental Research Letters",
+    "Global Environmental Change",
+    "Sustainability Science"
+)
+
+
+def _pool(values) -> tuple:
+    # Certaines locales Faker utilisent des dictionnaires pondérés
+    return tuple(values.keys() if isinstance(values, dict) else values)
+
+
+class TextEngine:
+    """Générateur de texte fr_FR à partir de listes chargées une seule fois
+
+    Reproduit l'allure de fake.sentence(), fake.name() et fake.slug() en tirant
+    les indices de mots par blocs plutôt qu'un appel Faker par mot.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.words = _pool(LoremProvider.word_list)
+        self.titled = {word: word.title() for word in self.words}
+        self.slug_words = _pool(EnglishLoremProvider.word_list)
+        self.first_names = _pool(PersonProvider.first_names)
+        self.last_names = _pool(PersonProvider.last_names)
+        self.seed(seed)
+
+    def seed(self, seed: Optional[int]):
+        """Réinitialise les générateurs aléatoires du moteur"""
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed) if np is not None else None
+
+    def _indices(self, upper: int, count: int) -> List[int]:
+        if self.np_rng is not None:
+            return self.np_rng.integers(0, upper, count).tolist()
+        # Sans numpy : 32 bits par tirage en un seul appel, réduits modulo upper
+        # (biais inférieur à upper / 2**32, négligeable pour des listes de mots)
+        return [x % upper for x in array("I", self.rng.randbytes(4 * count))]
+
+    def _draw(self, values: Sequence, count: int) -> List:
+        """count éléments de values tirés avec remise"""
+        if self.np_rng is not None:
+            return [values[i] for i in self.np_rng.integers(0, len(values), count).tolist()]
+        upper = len(values)
+        return [values[x % upper] for x in array("I", self.rng.randbytes(4 * count))]
+
+    def _lengths(self, count: int, nb_words: int) -> List[int]:
+        # Même variation que Faker : +/- 40 %, au moins un mot
+        low, high = max(1, int(nb_words * 0.6)), max(1, int(nb_words * 1.4))
+        return [low + i for i in self._indices(high - low + 1, count)]
+
+    def sentences(self, count: int, nb_words: int = 6) -> List[str]:
+        """Tire count phrases d'environ nb_words mots en un seul bloc"""
+        lengths = self._lengths(count, nb_words)
+        words = self._draw(self.words, sum(lengths))
+        titled = self.titled
+        result = []
+        start = 0
+        for length in lengths:
+            end = start + length
+            words[start] = titled[words[start]]
+            result.append(" ".join(words[start:end]) + ".")
+            start = end
+        return result
+
+    def sentence(self, nb_words: int = 6) -> str:
+        return self.sentences(1, nb_words)[0]
+
+    def paragraph(self, nb_sentences: int = 3) -> str:
+        """Paragraphe de nb_sentences phrases, à +/- 40 % près comme Faker"""
+        count = self._lengths(1, nb_sentences)[0]
+        return " ".join(self.sentences(count))
+
+    def names(self, count: int) -> List[str]:
+        """Noms complets, avec de temps en temps un nom composé"""
+        firsts = self._indices(len(self.first_names), count)
+        lasts = self._indices(len(self.last_names), count * 2)
+        result = []
+        for i in range(count):
+            last = self.last_names[lasts[2 * i]]
+            if self.rng.random() < 0.1:
+                last = f"{last}-{self.last_names[lasts[2 * i + 1]]}"
+            result.append(f"{self.first_names[firsts[i]]} {last}")
+        return result
+
+    def slug(self) -> str:
+        indices = self._indices(len(self.slug_words), self.rng.randint(2, 3))
+        return "-".join([self.slug_words[i] for i in indices])
+
+    def choice(self, values: Sequence):
+        return values[self._indices(len(values), 1)[0]]
+
+    def citation(self) -> str:
+        """Citation bibliographique au format académique"""
+        rng = self.rng
+        authors = ", ".join(self.names(rng.randint(1, 4)))
+        title = self.sentence(8).rstrip(".")
+        journal = self.choice(JOURNALS)
+        pages = f"{rng.randint(1, 999)}-{rng.randint(1000, 1999)}"
+        doi = f"10.{rng.randint(1000, 9999)}/{self.slug()}"
+        return "".join([
+            authors, " (", str(rng.randint(2020, 2025)), '). "', title, '". <em>', journal, "</em>, ",
+            str(rng.randint(1, 50)), ", ", pages, '. DOI: <a href="https://doi.org/', doi,
+            '" class="text-primary hover:underline">', doi, "</a>"
+        ])
@@ -0,0 +1,375 @@
+import asyncio
+import time
+import uuid
+from array import array
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from prisma import Json, Prisma
+
+from seed_metrics import metrics
+
+# Ordre d'écriture : les parents avant les enfants pour respecter les clés étrangères
+FLUSH_ORDER = ["category", "tag", "author", "education", "article", "component"]
+
+# Clé étrangère vers la ligne parente, pour écarter les enfants d'un parent non écrit
+PARENT_KEYS = {"education": "authorId", "article": "authorId", "component": "articleId"}
+
+# Colonnes Json : les lignes portent des dict, enveloppés dans Json pour create_many
+JSON_FIELDS = {"component": ("data",)}
+
+# Tables peuplées par les seeds, y compris la table de jointure implicite de Prisma
+SEEDED_TABLES = ["Component", "_ArticleToTag", "Article", "Education", "Author", "Tag", "Category"]
+
+
+def new_id() -> str:
+    """Génère un identifiant de type cuid côté client"""
+    return f"c{uuid.uuid4().hex[:24]}"
+
+
+class IdArray:
+    """Suite d'identifiants ASCII stockés bout à bout dans un seul bytearray
+
+    Environ 33 octets par id au lieu d'un objet str (ou d'une ligne entière)
+    par élément. Indexable, donc utilisable avec random.choice.
+    """
+
+    __slots__ = ("_data", "_offsets")
+
+    def __init__(self, values: Iterable[str] = ()):
+        self._data = bytearray()
+        self._offsets = array("Q", [0])
+        self.extend(values)
+
+    def append(self, value: str):
+        self._data += value.encode("ascii")
+        self._offsets.append(len(self._data))
+
+    def extend(self, values: Iterable[str]):
+        for value in values:
+            self.append(value)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("IdArray index out of range")
+        return self._data[self._offsets[index]:self._offsets[index + 1]].decode("ascii")
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def without(self, excluded: Set[str]) -> "IdArray":
+        """Copie sans les ids de excluded (par exemple writer.failed_ids)"""
+        return IdArray(value for value in self if value not in excluded)
+
+
+class BatchWriter:
+    """Accumule les lignes par modèle et les écrit par lots avec create_many
+
+    Avec skip_duplicates, les lignes dont une clé unique (slug, nom) existe
+    déjà sont ignorées au lieu de faire échouer tout le lot. Sinon, un lot
+    rejeté est coupé en deux et réessayé jusqu'à isoler les lignes fautives.
+    """
+
+    def __init__(self, db: Prisma, batch_size: int = 500, skip_duplicates: bool = False):
+        self.db = db
+        self.batch_size = batch_size
+        self.skip_duplicates = skip_duplicates
+        self.pending: Dict[str, List[Dict]] = defaultdict(list)
+        self.links: List[Tuple[str, str]] = []
+        self.written: Counter = Counter()
+        self.failed: Counter = Counter()
+        self.skipped: Counter = Counter()
+        self.failed_ids: set = set()
+        self.retries = 0
+        self._callbacks: Dict[str, List[Callable[[List[Dict]], None]]] = defaultdict(list)
+        self._lock = asyncio.Lock()
+
+    def on_written(self, model: str, callback: Callable[[List[Dict]], None]):
+        """Enregistre une fonction appelée avec chaque lot écrit avec succès"""
+        self._callbacks[model].append(callback)
+
+    async def add(self, model: str, row: Dict):
+        """Ajoute une ligne et déclenche l'écriture si le lot est plein"""
+        self.pending[model].append(row)
+        if len(self.pending[model]) >= self.batch_size:
+            await self.flush()
+
+    async def add_tags(self, article_id: str, tag_ids: List[str]):
+        """Ajoute les liens article-tag de la table implicite _ArticleToTag"""
+        self.links.extend((article_id, tag_id) for tag_id in tag_ids)
+        if len(self.links) >= self.batch_size * 3:
+            await self.flush()
+
+    async def flush(self):
+        """Écrit toutes les lignes en attente, modèle par modèle"""
+        async with self._lock:
+            # Instantané de tous les modèles d'un coup : une ligne ajoutée pendant
+            # l'écriture attend le flush suivant, avec la ligne parente qu'elle
+            # référence si celle-ci n'était pas encore dans l'instantané
+            pending, self.pending = self.pending, defaultdict(list)
+            links, self.links = self.links, []
+            for model in FLUSH_ORDER:
+                rows = pending.get(model)
+                if rows:
+                    await self._write_rows(model, rows)
+            if links:
+                await self._write_links(links)
+
+    async def _write_rows(self, model: str, rows: List[Dict]):
+        parent_key = PARENT_KEYS.get(model)
+        if parent_key and self.failed_ids:
+            orphans = [row for row in rows if row[parent_key] in self.failed_ids]
+            if orphans:
+                self.failed[model] += len(orphans)
+                self.failed_ids.update(row["id"] for row in orphans)
+                rows = [row for row in rows if row[parent_key] not in self.failed_ids]
+                if not rows:
+                    return
+        await self._create_many(model, rows)
+
+    async def _create_many(self, model: str, rows: List[Dict]):
+        data = rows
+        if model in JSON_FIELDS:
+            data = [{**row, **{field: Json(row[field]) for field in JSON_FIELDS[model]}} for row in rows]
+        try:
+            async with metrics.query(model, "create_many"):
+                count = await getattr(self.db, model).create_many(
+                    data=data, skip_duplicates=self.skip_duplicates
+                )
+        except Exception as e:
+            if len(rows) == 1:
+                print(f"Erreur écriture {model} {rows[0]['id']}: {e}")
+                self.failed[model] += 1
+                self.failed_ids.add(rows[0]["id"])
+                return
+            # Le lot entier est rejeté : on réessaie chaque moitié pour isoler les lignes fautives
+            self.retries += 1
+            middle = len(rows) // 2
+            await self._create_many(model, rows[:middle])
+            await self._create_many(model, rows[middle:])
+            return
+        if count < len(rows):
+            rows = await self._drop_skipped(model, rows)
+        self.written[model] += count
+        metrics.add_rows(model, count)
+        for callback in self._callbacks[model]:
+            callback(rows)
+
+    async def _drop_skipped(self, model: str, rows: List[Dict]) -> List[Dict]:
+        # Les doublons ignorés n'existent pas sous l'id attribué : on les traite en échecs
+        placeholders = ", ".join(f"${i + 1}" for i in range(len(rows)))
+        async with metrics.query(model, "find_inserted"):
+            found = await self.db.query_raw(
+                f'SELECT id FROM "{model.capitalize()}" WHERE id IN ({placeholders})',
+                *[row["id"] for row in rows]
+            )
+        inserted = {record["id"] for record in found}
+        skipped = [row for row in rows if row["id"] not in inserted]
+        self.skipped[model] += len(skipped)
+        self.failed_ids.update(row["id"] for row in skipped)
+        return [row for row in rows if row["id"] in inserted]
+
+    async def _write_links(self, links: List[Tuple[str, str]]):
+        # Les liens d'articles dont le lot a échoué violeraient la clé étrangère
+        links = [link for link in links if link[0] not in self.failed_ids]
+        if links:
+            await self._insert_links(links)
+
+    async def _insert_links(self, links: List[Tuple[str, str]]):
+        placeholders = ", ".join(
+            f"(${i * 2 + 1}, ${i * 2 + 2})" for i in range(len(links))
+        )
+        params = [value for link in links for value in link]
+        try:
+            async with metrics.query("_ArticleToTag", "insert"):
+                count = await self.db.execute_raw(
+                    f'INSERT INTO "_ArticleToTag" ("A", "B") VALUES {placeholders} ON CONFLICT DO NOTHING',
+                    *params
+                )
+        except Exception as e:
+            if len(links) == 1:
+                print(f"Erreur écriture lien article-tag {links[0]}: {e}")
+                self.failed["_ArticleToTag"] += 1
+                return
+            # Même découpage que _create_many : un tag inexistant ne fait perdre que son lien
+            self.retries += 1
+            middle = len(links) // 2
+            await self._insert_links(links[:middle])
+            await self._insert_links(links[middle:])
+            return
+        self.written["_ArticleToTag"] += count
+        metrics.add_rows("_ArticleToTag", count)
+
+
+class ArticleBatchWriter:
+    """Écrit les articles avec leurs tags et composants, N articles par transaction
+
+    create_many ne sait pas écrire les relations : chaque article passe par un
+    create imbriqué (tags.connect, components.create), mais les créations d'un
+    groupe partent ensemble dans un seul db.batch_(), exécuté en transaction.
+    Un groupe en échec est coupé en deux et réessayé jusqu'à isoler les
+    articles fautifs, sans perdre les autres.
+    """
+
+    def __init__(self, db: Prisma, batch_size: int = 50, parents: Optional[BatchWriter] = None):
+        self.db = db
+        self.batch_size = batch_size
+        # Writer des auteurs, catégories et tags, vidé avant chaque groupe
+        self.parents = parents
+        self.pending: List[Tuple[Dict, List[str], List[Dict]]] = []
+        self.written: Counter = Counter()
+        self.failed: Counter = Counter()
+        self.failed_ids: set = set()
+        self.retries = 0
+        self._callbacks: Dict[str, List[Callable[[List[Dict]], None]]] = defaultdict(list)
+        self._lock = asyncio.Lock()
+
+    def on_written(self, model: str, callback: Callable[[List[Dict]], None]):
+        """Enregistre une fonction appelée avec chaque groupe écrit avec succès"""
+        self._callbacks[model].append(callback)
+
+    async def add(self, article: Dict, tag_ids: List[str], components: List[Dict]):
+        """Ajoute un article, ses tags et ses composants ; écrit le groupe s'il est plein"""
+        self.pending.append((article, tag_ids, components))
+        if len(self.pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            if not self.pending:
+                return
+            group, self.pending = self.pending, []
+            if self.parents is not None:
+                await self.parents.flush()
+                orphans = [entry for entry in group if entry[0]["authorId"] in self.parents.failed_ids]
+                if orphans:
+                    self._fail(orphans, "auteur non écrit")
+                    group = [entry for entry in group if entry[0]["authorId"] not in self.parents.failed_ids]
+            if group:
+                await self._write(group)
+
+    async def _write(self, group: List[Tuple[Dict, List[str], List[Dict]]]):
+        try:
+            async with metrics.query("article", "batch"):
+                async with self.db.batch_() as batcher:
+                    for article, tag_ids, components in group:
+                        batcher.article.create(data={
+                            **article,
+                            "tags": {"connect": [{"id": tag_id} for tag_id in tag_ids]},
+                            "components": {"create": components}
+                        })
+        except Exception as e:
+            if len(group) == 1:
+                self._fail(group, str(e))
+                return
+            # La transaction a tout annulé : on réessaie chaque moitié séparément
+            self.retries += 1
+            middle = len(group) // 2
+            await self._write(group[:middle])
+            await self._write(group[middle:])
+            return
+
+        articles = [article for article, _, _ in group]
+        counts = {
+            "article": len(group),
+            "_ArticleToTag": sum(len(tag_ids) for _, tag_ids, _ in group),
+            "component": sum(len(components) for _, _, components in group)
+        }
+        for model, count in counts.items():
+            self.written[model] += count
+            metrics.add_rows(model, count)
+        for callback in self._callbacks["article"]:
+            callback(articles)
+
+    def _fail(self, group: List[Tuple[Dict, List[str], List[Dict]]], reason: str):
+        for article, _, _ in group:
+            print(f"Erreur écriture article {article.get('slug')}: {reason}")
+            self.failed_ids.add(article["id"])
+        self.failed["article"] += len(group)
+
+
+async def reset_tables(db: Prisma) -> str:
+    """Vide les tables du seed et retourne la stratégie utilisée
+
+    Un seul TRUNCATE ... CASCADE suffit quand les droits le permettent ; sinon
+    on revient aux delete_many successifs, enfants avant parents.
+    """
+    tables = ", ".join(f'"{table}"' for table in SEEDED_TABLES)
+    start = time.perf_counter()
+    try:
+        async with metrics.query("all", "truncate"):
+            await db.execute_raw(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+        print(f"Base vidée par TRUNCATE en {time.perf_counter() - start:.3f}s")
+        return "truncate"
+    except Exception as e:
+        print(f"TRUNCATE impossible après {time.perf_counter() - start:.3f}s ({e}), repli sur delete_many")
+
+    start = time.perf_counter()
+    for model in reversed(FLUSH_ORDER):
+        async with metrics.query(model, "delete_many"):
+            await getattr(db, model).delete_many()
+    print(f"Base vidée par delete_many en {time.perf_counter() - start:.3f}s")
+    return "delete_many"
+
+
+class AuthorStats:
+    """Compteurs dérivés des articles écrits, agrégés en mémoire par auteur"""
+
+    def __init__(self):
+        self.articles: Counter = Counter()
+        self.citations: Counter = Counter()
+
+    def add_articles(self, rows: List[Dict]):
+        """Callback on_written("article", ...) : cumule les articles d'un lot"""
+        for row in rows:
+            self.articles[row["authorId"]] += 1
+            self.citations[row["authorId"]] += row["citations"]
+
+    async def write(self, db: Prisma, chunk_size: int = 10000) -> int:
+        """Écrit articlesCount et citations de tous les auteurs en une passe UPDATE ... FROM (VALUES ...)
+
+        Les valeurs remplacent les compteurs : en reprise, passer plutôt par
+        recompute_author_stats, qui compte aussi les articles des runs précédents.
+        """
+        author_ids = list(self.articles)
+        updated = 0
+        for start in range(0, len(author_ids), chunk_size):
+            chunk = author_ids[start:start + chunk_size]
+            values = ", ".join(
+                f"(${i * 3 + 1}::text, ${i * 3 + 2}::int, ${i * 3 + 3}::int)" for i in range(len(chunk))
+            )
+            params = [
+                value for author_id in chunk
+                for value in (author_id, self.articles[author_id], self.citations[author_id])
+            ]
+            async with metrics.query("author", "update_stats"):
+                updated += await db.execute_raw(
+                    'UPDATE "Author" AS a SET "articlesCount" = v.n, "citations" = v.c '
+                    f'FROM (VALUES {values}) AS v(id, n, c) WHERE a.id = v.id',
+                    *params
+                )
+        return updated
+
+
+async def recompute_author_stats(db: Prisma) -> int:
+    """Recalcule articlesCount et citations de tous les auteurs depuis la table Article"""
+    async with metrics.query("author", "recompute_stats"):
+        return await db.execute_raw(
+            """
+            UPDATE "Author" AS a
+            SET "articlesCount" = s.n, "citations" = s.c
+            FROM (
+                SELECT au.id, COUNT(ar.id)::int AS n, COALESCE(SUM(ar.citations), 0)::int AS c
+                FROM "Author" au
+                LEFT JOIN "Article" ar ON ar."authorId" = au.id
+                GROUP BY au.id
+            ) AS s
+            WHERE a.id = s.id
+            """
+        )